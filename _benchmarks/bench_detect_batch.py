@@ -0,0 +1,76 @@
+"""
+Detection throughput vs. batch size: PeopleDetector.detect (one predict per frame)
+against detect_batch over 2, 4, 8 frames, on CPU.
+
+Run from the repo root:
+    python -m _benchmarks.bench_detect_batch [video_path]
+
+Frames are taken from video_path (default: random noise at VideoSettings' size).
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from config.settings import YOLOSettings, VideoSettings
+from detection.detector import PeopleDetector
+
+BATCH_SIZES = [1, 2, 4, 8]
+FRAMES = 64
+WARMUP = 2
+
+
+def load_frames(path, n):
+    if path is None:
+        video = VideoSettings()
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (video.height, video.width, 3), dtype=np.uint8) for _ in range(n)]
+
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise SystemExit(f"Could not read any frames from {path}")
+    # loop short clips so every batch size sees the same number of frames
+    return [frames[i % len(frames)] for i in range(n)]
+
+
+def run(detector, frames, batch_size, filter_class):
+    batches = [frames[i:i + batch_size] for i in range(0, len(frames), batch_size)]
+    for batch in batches[:WARMUP]:
+        detector.detect_batch(batch, filter_class)
+
+    start = time.perf_counter()
+    for batch in batches:
+        if batch_size == 1:
+            detector.detect(batch[0], filter_class)
+        else:
+            detector.detect_batch(batch, filter_class)
+    return time.perf_counter() - start
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    settings = YOLOSettings(use_gpu=False)
+    detector = PeopleDetector(settings)
+    frames = load_frames(path, FRAMES)
+    filter_class = [settings.person_class_id]
+
+    print(f"{'batch':>6} {'frames/s':>9} {'ms/frame':>9} {'ms/batch':>9} {'speedup':>8}")
+    baseline = None
+    for batch_size in BATCH_SIZES:
+        elapsed = run(detector, frames, batch_size, filter_class)
+        fps = len(frames) / elapsed
+        baseline = baseline or fps
+        print(f"{batch_size:>6} {fps:>9.1f} {1000 * elapsed / len(frames):>9.2f} "
+              f"{1000 * elapsed * batch_size / len(frames):>9.2f} {fps / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Encode time per frame: legacy dict + json.dumps path vs. FrameSerializer.
+
+Run from the repo root:
+    python -m _benchmarks.bench_serializer
+"""
+import json
+import time
+
+import numpy as np
+
+from datatypes.datatype import empty_frame_result
+from streamdata import jsonpack
+from streamdata.serializer import FrameSerializer
+
+CROWD_SIZES = [1, 5, 10, 25, 50, 100, 250, 500]
+REPEATS = 500
+TS = "12:34:56"
+
+
+def make_frame(n, rng):
+    result = empty_frame_result(n)
+    result["id"] = np.arange(n) + 1000
+    result["x"] = rng.uniform(-20, 20, n)
+    result["y"] = rng.uniform(-20, 20, n)
+    result["dir"] = rng.uniform(0, 360, n)
+    result["conf"] = rng.uniform(0, 1, n)
+    return result
+
+
+def legacy(result):
+    packet = jsonpack.format_live_packet(result, TS)
+    receiver = json.dumps(jsonpack.format_for_receiver(packet)).encode("utf-8")
+    log_line = json.dumps(packet) + "\n"
+    return receiver, log_line
+
+
+def time_per_frame(fn, result):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(result)
+    return (time.perf_counter() - start) / REPEATS * 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    serializer = FrameSerializer()
+
+    print(f"{'people':>7} {'legacy us':>10} {'single-pass us':>15} {'speedup':>8}")
+    for n in CROWD_SIZES:
+        result = make_frame(n, rng)
+
+        # both paths must produce identical bytes
+        receiver, log_line = legacy(result)
+        new_receiver, new_log = serializer.encode(result, TS)
+        assert bytes(new_receiver) == receiver
+        assert new_log.decode("ascii") == log_line
+
+        t_legacy = time_per_frame(legacy, result)
+        t_new = time_per_frame(lambda r: serializer.encode(r, TS), result)
+        print(f"{n:>7} {t_legacy:>10.1f} {t_new:>15.1f} {t_legacy / t_new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Tracking latency per frame: ByteTrackerWrapper (sv.Detections + sv.ByteTrack) against
+NumpyByteTracker on the raw (N, 6) model rows, with a frame-by-frame id comparison.
+
+Run from the repo root:
+    python -m _benchmarks.bench_tracker [video_path]
+
+With video_path, the clip goes through PeopleDetector once and both trackers replay
+the same detections; without it, a simulated crowd is used.
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+import supervision as sv
+
+from config.settings import YOLOSettings
+from detection.detector import PeopleDetector
+from tracking.numpy_tracker import NumpyByteTracker
+from tracking.tracker import ByteTrackerWrapper
+
+MAX_FRAMES = 900
+SIM_PEOPLE = 25
+SIM_SIZE = (1920, 1080)
+
+
+def detect_clip(path):
+    """(N, 6) [x1, y1, x2, y2, score, class] per frame."""
+    settings = YOLOSettings()
+    detector = PeopleDetector(settings)
+    cap = cv2.VideoCapture(path)
+    rows = []
+    while len(rows) < MAX_FRAMES:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frame_rows, _ = detector.detect_raw(frame, [settings.person_class_id])
+        rows.append(frame_rows)
+    cap.release()
+    if not rows:
+        raise SystemExit(f"Could not read any frames from {path}")
+    return rows
+
+
+def simulate(n_frames, people, rng):
+    """Walkers with jitter, missed detections, low scores and a few false positives."""
+    w, h = SIM_SIZE
+    pos = rng.uniform([0, 0], [w, h], (people, 2))
+    vel = rng.normal(0, 3, (people, 2))
+    size = rng.uniform([40, 100], [80, 260], (people, 2))
+    rows = []
+    for _ in range(n_frames):
+        vel += rng.normal(0, 0.3, vel.shape)
+        pos = (pos + vel) % [w, h]
+        seen = rng.random(people) > 0.1
+        centers = pos[seen] + rng.normal(0, 2, (seen.sum(), 2))
+        wh = size[seen] * rng.uniform(0.9, 1.1, (seen.sum(), 2))
+        scores = rng.uniform(0.05, 0.95, seen.sum())
+        n_false = rng.poisson(1)
+        centers = np.vstack([centers, rng.uniform([0, 0], [w, h], (n_false, 2))])
+        wh = np.vstack([wh, rng.uniform(20, 80, (n_false, 2))])
+        scores = np.concatenate([scores, rng.uniform(0.05, 0.5, n_false)])
+        rows.append(np.column_stack([centers - wh / 2, centers + wh / 2, scores, np.zeros(len(scores))])
+                    .astype(np.float32))
+    return rows
+
+
+def replay(frames):
+    wrapper = ByteTrackerWrapper()
+    tracker = NumpyByteTracker()
+    t_wrapper, t_numpy = [], []
+    mismatches = 0
+    for rows in frames:
+        start = time.perf_counter()
+        det = sv.Detections(xyxy=rows[:, :4], confidence=rows[:, 4], class_id=rows[:, 5].astype(int))
+        reference = wrapper.update_with_detections(det)
+        t_wrapper.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        tracks = tracker.update(rows)
+        t_numpy.append(time.perf_counter() - start)
+
+        if not np.array_equal(reference.tracker_id, tracks.tracker_id):
+            mismatches += 1
+    return np.array(t_wrapper) * 1e6, np.array(t_numpy) * 1e6, mismatches
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    if path is None:
+        frames = simulate(MAX_FRAMES, SIM_PEOPLE, np.random.default_rng(0))
+        print(f"{len(frames)} simulated frames, {SIM_PEOPLE} people")
+    else:
+        frames = detect_clip(path)
+        print(f"{len(frames)} frames from {path}")
+    people = np.mean([len(rows) for rows in frames])
+
+    t_wrapper, t_numpy, mismatches = replay(frames)
+    print(f"{'':>18} {'mean us':>9} {'p95 us':>9} {'max us':>9}")
+    for label, t in (("ByteTrackerWrapper", t_wrapper), ("NumpyByteTracker", t_numpy)):
+        print(f"{label:>18} {t.mean():>9.0f} {np.percentile(t, 95):>9.0f} {t.max():>9.0f}")
+    print(f"\n{people:.1f} detections/frame, speedup {t_wrapper.mean() / t_numpy.mean():.2f}x, "
+          f"{mismatches} frames with different ids")
+
+
+if __name__ == "__main__":
+    main()
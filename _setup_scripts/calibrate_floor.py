@@ -1,44 +1,67 @@
 # calibrate_floor.py
+import json
 import cv2, numpy as np
 
 CAM_INDEX = "Footage/People walking.mp4"
 SAVE_PATH = "H.npy"   # homografie wordt hier opgeslagen
 
+# Optioneel: lensvervorming mee-fitten en een pixel -> vloer lookup table bakken
+FIT_LENS = False      # fit camera-intrinsics + distortie (8+ punten); alleen zinvol met TrackingSettings.use_lut = True
+LUT_PATH = "lut.npy"  # (rijen, kolommen, 2) float32, memory-mappable voor Projector
+LUT_STRIDE = 4        # pixelafstand van het LUT-raster; wordt naast de LUT opgeslagen (lut.json) en door Projector gelezen
+
+# Optioneel: het beloopbare vloervlak intekenen, zodat detectie alleen daar hoeft te draaien (RoiSettings)
+DRAW_ROI = False      # alleen nodig met RoiSettings.mode "crop" of "tiles"; zonder roi.npy valt RoiDetector terug op world_bounds
+ROI_PATH = "roi.npy"  # (N, 2) int32 pixelpolygoon
+
+NUM_POINTS = 8 if FIT_LENS else 4   # minimaal aantal vloerpunten
+MAX_POINTS = 20
+
+WINDOW = f"Klik {NUM_POINTS}+ vloerpunten (ESC als klaar)"
+
 clicked = []
 
 def mouse_cb(event, x, y, flags, param):
-    if event == cv2.EVENT_LBUTTONDOWN and len(clicked)<4:
+    if event == cv2.EVENT_LBUTTONDOWN and len(clicked)<MAX_POINTS:
         clicked.append((x,y))
         print(f"Pixelpunt {len(clicked)}: {(x,y)}")
 
 cap = cv2.VideoCapture(CAM_INDEX)
-cv2.namedWindow("Klik 4 vloerpunten (ESC als klaar)")
-cv2.setMouseCallback("Klik 4 vloerpunten (ESC als klaar)", mouse_cb)
+cv2.namedWindow(WINDOW)
+cv2.setMouseCallback(WINDOW, mouse_cb)
 
-print(">> Klik 4 vloerpunten in volgorde (bijv. linksonder, rechtsonder, rechtsboven, linksboven).")
-print(">> Daarna vraagt het script om de bijbehorende 4 (X,Y)-meters.")
+print(f">> Klik minimaal {NUM_POINTS} vloerpunten in volgorde (bijv. linksonder, rechtsonder, rechtsboven, linksboven).")
+if FIT_LENS:
+    print(">> Verspreid de punten over het hele beeld, ook langs de randen, zodat de lensvervorming gefit kan worden.")
+print(">> Daarna vraagt het script om de bijbehorende (X,Y)-meters.")
+frame_size = None
+last_frame = None
 while True:
     ok, frame = cap.read()
     if not ok: break
+    last_frame = frame
+    frame_size = (frame.shape[1], frame.shape[0])
     vis = frame.copy()
     for i,(x,y) in enumerate(clicked):
         cv2.circle(vis,(x,y),6,(0,255,255),-1)
         cv2.putText(vis,str(i+1),(x+8,y-8),cv2.FONT_HERSHEY_SIMPLEX,0.7,(0,255,255),2)
-    cv2.imshow("Klik 4 vloerpunten (ESC als klaar)", vis)
+    cv2.imshow(WINDOW, vis)
     key = cv2.waitKey(80) & 0xFF
-    if key == 27 and len(clicked)==4:
+    if key == 27 and len(clicked)>=NUM_POINTS:
         break
-    
+
 
 cap.release()
 cv2.destroyAllWindows()
 
-if len(clicked)!=4:
-    raise SystemExit("Niet genoeg punten geklikt (4 nodig).")
+if frame_size is None:
+    raise SystemExit(f"Kon geen beelden lezen van {CAM_INDEX}.")
+if len(clicked)<NUM_POINTS:
+    raise SystemExit(f"Niet genoeg punten geklikt ({NUM_POINTS} nodig).")
 
-print("\nVoer nu de 4 overeenkomstige VLOER-coördinaten (in meters) in **dezelfde volgorde** in.")
+print(f"\nVoer nu de {len(clicked)} overeenkomstige VLOER-coördinaten (in meters) in **dezelfde volgorde** in.")
 floor_pts = []
-for i in range(4):
+for i in range(len(clicked)):
     X = float(input(f"Vloer X{i+1} (m): "))
     Y = float(input(f"Vloer Y{i+1} (m): "))
     floor_pts.append([X,Y])
@@ -50,3 +73,83 @@ wr = np.array(floor_pts, dtype=np.float32)
 H, mask = cv2.findHomography(px, wr, method=cv2.RANSAC)
 np.save(SAVE_PATH, H)
 print(f"\n✅ Homografie opgeslagen naar {SAVE_PATH}")
+
+# ---------------------------------------------------------------
+# Lensmodel + lookup table (pixel → meters)
+# ---------------------------------------------------------------
+w, h = frame_size
+K = None
+dist = None
+H_undist = H
+
+if FIT_LENS:
+    # Alle punten liggen op de vloer (Z=0), dus één view van een vlak object volstaat
+    # voor focal length + radiale distortie als de punten goed verspreid liggen.
+    obj = np.hstack([wr, np.zeros((len(wr), 1), dtype=np.float32)]).reshape(-1, 1, 3)
+    img = px.reshape(-1, 1, 2)
+    K0 = np.array([[w, 0, w / 2],
+                   [0, w, h / 2],
+                   [0, 0, 1]], dtype=np.float64)
+    flags = (cv2.CALIB_USE_INTRINSIC_GUESS | cv2.CALIB_FIX_PRINCIPAL_POINT | cv2.CALIB_FIX_ASPECT_RATIO
+             | cv2.CALIB_ZERO_TANGENT_DIST | cv2.CALIB_FIX_K3)
+    rms, K, dist, _, _ = cv2.calibrateCamera([obj], [img], (w, h), K0, None, flags=flags)
+    print(f"Lensfit RMS: {rms:.2f} px, f={K[0,0]:.1f}, k1={dist.ravel()[0]:.4f}, k2={dist.ravel()[1]:.4f}")
+
+    # homografie tussen onvervormde pixels en de vloer
+    px_undist = cv2.undistortPoints(img, K, dist, P=K).reshape(-1, 2)
+    H_undist, _ = cv2.findHomography(px_undist, wr, method=cv2.RANSAC)
+
+# Raster over het hele beeld, inclusief de laatste pixelrij/-kolom
+cols = (w - 1) // LUT_STRIDE + 2
+rows = (h - 1) // LUT_STRIDE + 2
+gx, gy = np.meshgrid(np.arange(cols, dtype=np.float32) * LUT_STRIDE,
+                     np.arange(rows, dtype=np.float32) * LUT_STRIDE)
+grid = np.stack([gx, gy], axis=-1).reshape(-1, 1, 2)
+
+if K is not None:
+    grid = cv2.undistortPoints(grid, K, dist, P=K)
+lut = cv2.perspectiveTransform(grid, H_undist).reshape(rows, cols, 2).astype(np.float32)
+
+np.save(LUT_PATH, lut)
+# de stride hoort bij de LUT; Projector leest hem hieruit
+LUT_META_PATH = LUT_PATH[:-len(".npy")] + ".json"  # zelfde naam als transform.projection.lut_meta_path
+with open(LUT_META_PATH, "w") as f:
+    json.dump({"stride": LUT_STRIDE, "frame_size": [w, h]}, f)
+print(f"✅ Lookup table ({rows}x{cols}, stride {LUT_STRIDE}) opgeslagen naar {LUT_PATH} (+ {LUT_META_PATH})")
+
+# ---------------------------------------------------------------
+# Beloopbaar vloervlak (ROI voor detectie)
+# ---------------------------------------------------------------
+if DRAW_ROI and last_frame is not None:
+    ROI_WINDOW = "Klik de hoeken van het vloervlak (ENTER = opslaan, BACKSPACE = ongedaan, ESC = overslaan)"
+    roi_pts = []
+
+    def roi_cb(event, x, y, flags, param):
+        if event == cv2.EVENT_LBUTTONDOWN:
+            roi_pts.append((x, y))
+
+    print("\n>> Klik nu de hoeken van het vloervlak waar mensen kunnen lopen, rondom in volgorde.")
+    cv2.namedWindow(ROI_WINDOW)
+    cv2.setMouseCallback(ROI_WINDOW, roi_cb)
+    while True:
+        vis = last_frame.copy()
+        if len(roi_pts) > 1:
+            cv2.polylines(vis, [np.array(roi_pts, dtype=np.int32)], True, (0, 255, 0), 2)
+        for (x, y) in roi_pts:
+            cv2.circle(vis, (x, y), 5, (0, 255, 0), -1)
+        cv2.imshow(ROI_WINDOW, vis)
+        key = cv2.waitKey(30) & 0xFF
+        if key == 27:
+            roi_pts = []
+            break
+        if key in (10, 13) and len(roi_pts) >= 3:
+            break
+        if key == 8 and roi_pts:
+            roi_pts.pop()
+    cv2.destroyAllWindows()
+
+    if roi_pts:
+        np.save(ROI_PATH, np.array(roi_pts, dtype=np.int32))
+        print(f"✅ Vloervlak ({len(roi_pts)} punten) opgeslagen naar {ROI_PATH}")
+    else:
+        print("Geen vloervlak opgeslagen.")
@@ -1,8 +1,113 @@
+"""
+Exports the detection model to the formats the detector backends can run
+(ONNX, OpenVINO and, with a CUDA GPU, TensorRT) and benchmarks every one of
+them on recorded footage, so the fastest can be set in YOLOSettings.
+
+Run from the repo root:
+    python -m _setup_scripts.optimize_model [video_path]
+
+Exporting needs ultralytics (+ onnx / openvino for those formats); formats whose
+exporter or runtime is not installed are skipped.
+"""
+import sys
+import time
+from dataclasses import replace
+
+import cv2
 from ultralytics import YOLO
-from config import *
+import torch
+
+from config.settings import YOLOSettings
+from detection.detector import PeopleDetector
+
+FOOTAGE = "footage/People walking.mp4"
+BENCH_FRAMES = 100
+WARMUP = 5
+
+# format -> backend that runs the exported file
+EXPORTS = {
+    "onnx": "onnxruntime",
+    "openvino": "openvino",
+}
+if torch.cuda.is_available():
+    EXPORTS["engine"] = "ultralytics"  # TensorRT engines load through ultralytics.YOLO
+
+
+def load_frames(path, n):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise SystemExit(f"Could not read any frames from {path}")
+    return frames
+
+
+def export_all(settings):
+    """Returns [(label, backend, model_path)], starting with the original model."""
+    candidates = [("pytorch", "ultralytics", settings.model_path)]
+    for fmt, backend in EXPORTS.items():
+        print(f"Exporting {settings.model_path} to {fmt}...")
+        try:
+            path = YOLO(settings.model_path).export(format=fmt, imgsz=settings.imgsz)
+        except Exception as e:
+            print(f"[WARN] Export to {fmt} failed, skipping: {e}")
+            continue
+        candidates.append((fmt, backend, str(path)))
+    return candidates
+
+
+def benchmark(settings, frames):
+    """Average ms per frame and average people per frame, or None if the backend cannot run."""
+    try:
+        detector = PeopleDetector(settings)
+    except Exception as e:
+        print(f"[WARN] Backend '{settings.backend}' could not load {settings.model_path}: {e}")
+        return None
+
+    filter_class = [settings.person_class_id]
+    for frame in frames[:WARMUP]:
+        detector.detect(frame, filter_class)
+
+    people = 0
+    start = time.perf_counter()
+    for frame in frames:
+        det, _ = detector.detect(frame, filter_class)
+        people += len(det)
+    elapsed = time.perf_counter() - start
+    return 1000.0 * elapsed / len(frames), people / len(frames)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else FOOTAGE
+    base = YOLOSettings()
+    frames = load_frames(path, BENCH_FRAMES)
+
+    results = []
+    for label, backend, model_path in export_all(base):
+        # the exported formats are meant for CPU boxes; TensorRT only runs on the GPU
+        settings = replace(base, backend=backend, model_path=model_path, use_gpu=(label == "engine"))
+        measured = benchmark(settings, frames)
+        if measured is not None:
+            results.append((label, backend, model_path) + measured)
+
+    if not results:
+        raise SystemExit("No backend could run the model.")
+
+    print(f"\n{len(frames)} frames from {path}")
+    print(f"{'format':>9} {'backend':>12} {'ms/frame':>9} {'fps':>7} {'people/frame':>13}")
+    for label, backend, model_path, ms, people in results:
+        print(f"{label:>9} {backend:>12} {ms:>9.1f} {1000.0 / ms:>7.1f} {people:>13.2f}")
+
+    label, backend, model_path, ms, _ = min(results, key=lambda r: r[3])
+    print(f"\nFastest: {label} ({ms:.1f} ms/frame). Use it with these YOLOSettings:")
+    print(f'    backend: str = "{backend}"')
+    print(f'    model_path: str = "{model_path}"')
 
-# Load the YOLO11 model
-model = YOLO(MODEL_PATH)
 
-# Export the model to TensorRT format
-model.export(format="engine")
+if __name__ == "__main__":
+    main()
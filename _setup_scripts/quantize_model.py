@@ -0,0 +1,123 @@
+"""
+Builds an INT8 version of the exported ONNX model with onnxruntime static
+quantization, calibrated on frames from our own footage.
+
+Run from the repo root (after _setup_scripts/optimize_model.py exported the .onnx):
+    python -m _setup_scripts.quantize_model [video_path]
+
+Then check what it costs with _setup_scripts/validate_model.py and, if acceptable,
+run it through the onnxruntime backend:
+    YOLOSettings.backend = "onnxruntime", YOLOSettings.model_path = OUTPUT_MODEL
+"""
+import os
+import re
+import sys
+
+import cv2
+import numpy as np
+import onnx
+from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType,
+                                      quantize_static)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+from framesource.preprocess import Letterboxer
+
+FOOTAGE = "footage/People walking.mp4"
+INPUT_MODEL = "models/yolov8n.onnx"
+OUTPUT_MODEL = "models/yolov8n_int8.onnx"
+CALIBRATION_FRAMES = 200  # spread evenly over the clip
+KEEP_HEAD_FP32 = True     # the box/class head is the most sensitive to INT8; leave it in float
+
+
+class FootageCalibrationReader(CalibrationDataReader):
+    """Feeds letterboxed frames from a clip, preprocessed exactly like the onnxruntime backend does."""
+
+    def __init__(self, path, input_name, input_shape, count):
+        _, _, h, w = input_shape
+        letterbox = Letterboxer(max(h, w), square=True)
+
+        cap = cv2.VideoCapture(path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+        wanted = set(np.linspace(0, total - 1, min(count, total)).astype(int).tolist())
+        self.blobs = []
+        index = 0
+        while len(self.blobs) < len(wanted):
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if index in wanted:
+                prepared = letterbox(frame)
+                self.blobs.append(cv2.dnn.blobFromImage(prepared.image, scalefactor=1 / 255.0, swapRB=True))
+            index += 1
+        cap.release()
+        if not self.blobs:
+            raise SystemExit(f"Could not read any frames from {path}")
+
+        print(f"Calibrating on {len(self.blobs)} frames from {path}")
+        self.input_name = input_name
+        self._iter = iter(self.blobs)
+
+    def get_next(self):
+        blob = next(self._iter, None)
+        return None if blob is None else {self.input_name: blob}
+
+    def rewind(self):
+        self._iter = iter(self.blobs)
+
+
+def head_nodes(model) -> list:
+    """Names of the nodes in the last /model.N/ block (the Detect head of ultralytics exports)."""
+    blocks = {}
+    for node in model.graph.node:
+        match = re.match(r"/model\.(\d+)/", node.name)
+        if match:
+            blocks.setdefault(int(match.group(1)), []).append(node.name)
+    return blocks[max(blocks)] if blocks else []
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else FOOTAGE
+    if not os.path.exists(INPUT_MODEL):
+        raise SystemExit(f"{INPUT_MODEL} not found, export it first with _setup_scripts/optimize_model.py")
+
+    # shape inference + graph cleanup first, as onnxruntime recommends for static quantization
+    prepared_model = OUTPUT_MODEL.replace(".onnx", "_prep.onnx")
+    try:
+        quant_pre_process(INPUT_MODEL, prepared_model)
+    except Exception as e:
+        print(f"[WARN] Pre-processing failed ({e}); quantizing the model as exported.")
+        prepared_model = INPUT_MODEL
+
+    model = onnx.load(prepared_model)
+    graph_input = model.graph.input[0]
+    input_shape = [d.dim_value or 1 for d in graph_input.type.tensor_type.shape.dim]
+    if input_shape[2] <= 1 or input_shape[3] <= 1:
+        raise SystemExit("The model has a dynamic input size; export it with a fixed imgsz for calibration.")
+
+    excluded = head_nodes(model) if KEEP_HEAD_FP32 else []
+    if excluded:
+        print(f"Keeping {len(excluded)} head nodes in float")
+
+    reader = FootageCalibrationReader(path, graph_input.name, input_shape, CALIBRATION_FRAMES)
+    quantize_static(
+        prepared_model,
+        OUTPUT_MODEL,
+        reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=excluded,
+    )
+    if prepared_model != INPUT_MODEL:
+        os.remove(prepared_model)
+
+    size_in = os.path.getsize(INPUT_MODEL) / 1e6
+    size_out = os.path.getsize(OUTPUT_MODEL) / 1e6
+    print(f"✅ INT8 model saved to {OUTPUT_MODEL} ({size_in:.1f} MB -> {size_out:.1f} MB)")
+    print("Compare it to the float model with: python -m _setup_scripts.validate_model")
+
+
+if __name__ == "__main__":
+    main()
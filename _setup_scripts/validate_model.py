@@ -0,0 +1,142 @@
+"""
+Runs a reference model and a candidate model (by default the fp32 ONNX export and
+its INT8 version from quantize_model.py) over the same clip and reports:
+  - latency per frame
+  - person-detection precision / recall of the candidate, with the reference as ground truth
+  - track-ID stability: ids, track length and how often the candidate's ids switch
+    on people the reference tracks with one id
+
+Run from the repo root:
+    python -m _setup_scripts.validate_model [video_path] [reference_model] [candidate_model]
+"""
+import sys
+import time
+from dataclasses import replace
+
+import cv2
+import numpy as np
+
+from config.settings import YOLOSettings
+from detection.detector import PeopleDetector
+from tracking.tracker import ByteTrackerWrapper
+
+FOOTAGE = "footage/People walking.mp4"
+REFERENCE_MODEL = "models/yolov8n.onnx"
+CANDIDATE_MODEL = "models/yolov8n_int8.onnx"
+BACKEND = "onnxruntime"
+MAX_FRAMES = 600
+MATCH_IOU = 0.5
+
+
+def run_model(settings, path):
+    """Per frame: (latency s, detections, tracks) for the whole clip."""
+    detector = PeopleDetector(settings)
+    tracker = ByteTrackerWrapper()
+    filter_class = [settings.person_class_id]
+
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < MAX_FRAMES:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if not frames:
+            detector.detect(frame, filter_class)  # warm-up, not timed
+        start = time.perf_counter()
+        det, _ = detector.detect(frame, filter_class)
+        latency = time.perf_counter() - start
+        frames.append((latency, det, tracker.update_with_detections(det)))
+    cap.release()
+    if not frames:
+        raise SystemExit(f"Could not read any frames from {path}")
+    return frames
+
+
+def box_iou(a, b):
+    """(N, 4) x (M, 4) -> (N, M)"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def greedy_match(a, b, threshold):
+    """Pairs (i, j) of boxes with IoU >= threshold, best pairs first, each box used once."""
+    iou = box_iou(a, b)
+    pairs = []
+    while iou.size and iou.max() >= threshold:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        pairs.append((i, j))
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return pairs
+
+
+def track_summary(frames):
+    lengths = {}
+    for _, _, tracks in frames:
+        if tracks.tracker_id is not None:
+            for tid in tracks.tracker_id.tolist():
+                lengths[tid] = lengths.get(tid, 0) + 1
+    return len(lengths), (np.mean(list(lengths.values())) if lengths else 0.0)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else FOOTAGE
+    reference_model = sys.argv[2] if len(sys.argv) > 2 else REFERENCE_MODEL
+    candidate_model = sys.argv[3] if len(sys.argv) > 3 else CANDIDATE_MODEL
+
+    base = replace(YOLOSettings(), backend=BACKEND, use_gpu=False)
+    print(f"Reference: {reference_model}")
+    reference = run_model(replace(base, model_path=reference_model), path)
+    print(f"Candidate: {candidate_model}")
+    candidate = run_model(replace(base, model_path=candidate_model), path)
+    n = min(len(reference), len(candidate))
+
+    # detection agreement, reference = ground truth
+    matched = ref_total = cand_total = 0
+    for (_, ref_det, _), (_, cand_det, _) in zip(reference[:n], candidate[:n]):
+        matched += len(greedy_match(ref_det.xyxy, cand_det.xyxy, MATCH_IOU))
+        ref_total += len(ref_det)
+        cand_total += len(cand_det)
+    recall = matched / ref_total if ref_total else 1.0
+    precision = matched / cand_total if cand_total else 1.0
+
+    # id switches: a reference id whose matched candidate id changes
+    switches = 0
+    last_match = {}
+    for (_, _, ref_tracks), (_, _, cand_tracks) in zip(reference[:n], candidate[:n]):
+        if ref_tracks.tracker_id is None or cand_tracks.tracker_id is None:
+            continue
+        for i, j in greedy_match(ref_tracks.xyxy, cand_tracks.xyxy, MATCH_IOU):
+            ref_id, cand_id = int(ref_tracks.tracker_id[i]), int(cand_tracks.tracker_id[j])
+            if ref_id in last_match and last_match[ref_id] != cand_id:
+                switches += 1
+            last_match[ref_id] = cand_id
+
+    ref_ids, ref_len = track_summary(reference[:n])
+    cand_ids, cand_len = track_summary(candidate[:n])
+    ref_ms = 1000 * np.mean([f[0] for f in reference[:n]])
+    cand_ms = 1000 * np.mean([f[0] for f in candidate[:n]])
+    ref_p95 = 1000 * np.percentile([f[0] for f in reference[:n]], 95)
+    cand_p95 = 1000 * np.percentile([f[0] for f in candidate[:n]], 95)
+
+    print(f"\n{n} frames from {path}")
+    print(f"{'':>22} {'reference':>10} {'candidate':>10}")
+    print(f"{'latency ms (mean)':>22} {ref_ms:>10.1f} {cand_ms:>10.1f}   ({ref_ms / cand_ms:.2f}x)")
+    print(f"{'latency ms (p95)':>22} {ref_p95:>10.1f} {cand_p95:>10.1f}")
+    print(f"{'people / frame':>22} {ref_total / n:>10.2f} {cand_total / n:>10.2f}")
+    print(f"{'track ids':>22} {ref_ids:>10} {cand_ids:>10}")
+    print(f"{'mean track length':>22} {ref_len:>10.1f} {cand_len:>10.1f}")
+    print(f"\nCandidate vs reference: recall {100 * recall:.1f}%, precision {100 * precision:.1f}%, "
+          f"{switches} id switches on reference tracks")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import List, Optional, Tuple
 
 @dataclass
 class YOLOSettings:
-    model_path: str = "models/yolov8n.pt"
+    model_path: str = "models/yolov8n.pt"  # for onnxruntime also the INT8 model from _setup_scripts/quantize_model.py
     conf_threshold: float = 0.1
     iou_threshold: float = 0.5
     person_class_id: int = 0
     use_gpu: bool = True
+    imgsz: int = 640  # model input size (longest side)
+    backend: str = "ultralytics"  # "ultralytics" (.pt, torch), "onnxruntime" (.onnx) or "openvino" (*_openvino_model dir); see _setup_scripts/optimize_model.py
+    num_threads: Optional[int] = None  # CPU inference threads for onnxruntime/openvino; None = library default
 
 
 @dataclass
@@ -15,6 +18,60 @@ class TrackingSettings:
     ema_alpha: float = 0.9  # default = 0.6
     use_homography: bool = True
     homography_path: str = "homography/H.npy"
+    use_lut: bool = False  # pixel -> floor lookup table (lens undistortion baked in), takes precedence over H.npy
+    lut_path: str = "homography/lut.npy"
+    lut_stride: int = 4  # grid spacing in pixels, only for tables without the lut.json sidecar calibrate_floor.py writes
+    lost_track_buffer: int = 30  # frames (at 30 fps) ByteTrack keeps a lost track before dropping it
+    tracker: str = "bytetrack"  # "bytetrack" (supervision) or "numpy" (same ids, plain arrays, tracking/numpy_tracker.py)
+    track_ttl: Optional[float] = None  # seconds smoother state outlives its last update; None = as many frames as the tracker keeps a lost id
+    track_pool_size: int = 64  # preallocated smoother slots, grows if ever exceeded
+
+
+@dataclass
+class DetectionScheduleSettings:
+    interval: int = 1  # run the detector every Nth frame and propagate the tracks in between (1 = every frame)
+    adaptive: bool = False  # grow the interval up to max_interval while the scene is calm, back to 1 on fast motion
+    max_interval: int = 6
+    propagation: str = "flow"  # "flow" (sparse optical flow inside each box) or "velocity" (constant velocity per track)
+    motion_threshold: float = 6.0  # px per frame (full resolution) above which adaptive mode detects every frame
+    flow_width: int = 480  # optical flow runs on a grayscale copy this wide
+
+
+@dataclass
+class MotionGateSettings:
+    enabled: bool = False  # skip detection while nothing moves on the floor (tracks are kept alive meanwhile)
+    method: str = "diff"  # "diff" (against the last frame with motion) or "mog2" (background model)
+    width: int = 160  # the gate works on a grayscale copy this wide
+    threshold: float = 25  # per-pixel change (diff) / MOG2 variance threshold
+    min_area: float = 0.002  # fraction of the watched pixels that must change to count as motion
+    cooldown: int = 15  # frames to keep detecting after the last motion
+    max_skip_seconds: float = 5.0  # detect at least this often, even in a static scene
+    use_roi: bool = True  # only watch the floor polygon (RoiSettings) when one is available
+
+
+@dataclass
+class ResolutionSettings:
+    enabled: bool = False  # lower imgsz (then detect less often) when frames take longer than the budget, raise it again when there is room
+    target_ms: Optional[float] = None  # per-frame budget for detect + track + output, None = 1000 / video.target_fps
+    min_imgsz: int = 320  # multiples of 32
+    max_imgsz: int = 640
+    step: int = 64
+    max_stride: int = 3  # at min_imgsz, detect every Nth frame at most (tracks are propagated in between)
+    window: int = 30  # frames averaged per decision
+    headroom: float = 0.7  # step back up when the average stays below this fraction of the budget...
+    patience: int = 3  # ...for this many windows in a row
+    log_path: Optional[str] = "resolution_changes.csv"  # every change is appended here, None = console only
+
+
+@dataclass
+class RoiSettings:
+    mode: str = "off"  # "off", "crop" (detect on the floor region only) or "tiles" (overlapping tiles over it, merged with NMS)
+    roi_path: str = "homography/roi.npy"  # floor polygon drawn in calibrate_floor.py, pixels
+    world_bounds: Optional[Tuple[float, float, float, float]] = None  # (x_min, y_min, x_max, y_max) meters, used via H.npy when there is no roi.npy
+    head_room: int = 250  # pixels above the floor region kept in the crop (people stand on it, their heads are higher)
+    margin: int = 16  # pixels around the floor region on the other sides
+    tile_size: int = 640  # tile edge in frame pixels; smaller tiles = more effective resolution, more inference
+    tile_overlap: int = 128  # should be about the width of a person at the far end of the floor
 
 
 @dataclass
@@ -27,6 +84,10 @@ class VideoSettings:
     width: int = 1920
     height: int = 1080
     target_fps: int = 30
+    ring_size: int = 8  # preallocated capture buffers; frames held by the pipeline count against this
+    skip_decode: bool = False  # only grab() (no decode) frames arriving faster than target_fps
+    capture_stride: int = 1  # decode every Nth frame only (offline files seek past long gaps)
+    letterbox_in_capture: bool = False  # resize/letterbox to yolo.imgsz on the capture thread instead of inside predict()
     
 
 @dataclass
@@ -40,6 +101,26 @@ class Visualizer:
 class NetworkSettings:
     host: str = "127.0.0.1"
     port: int = 9999
+    protocol: str = "json"  # "json" (existing receivers), "binary" (streamdata/messaging.py) or "delta" (streamdata/delta.py)
+    keyframe_interval: int = 30  # delta protocol: frames between full keyframes
+    fragment: bool = False  # split frames into MTU-sized datagrams with a fragment header (receiver must reassemble)
+    max_datagram: int = 1400  # bytes per datagram when fragmenting
+    targets: List[Tuple[str, int]] = field(default_factory=list)  # unicast receivers; empty = just host:port
+    multicast_group: Optional[str] = None  # e.g. "239.0.0.1" to also publish to a multicast group
+    multicast_port: Optional[int] = None  # defaults to port
+    multicast_ttl: int = 1
+    async_send: bool = False  # encode + send on a background asyncio loop
+    send_queue_size: int = 4  # frames waiting for the background loop before new ones are dropped
+
+
+@dataclass
+class PipelineSettings:
+    enabled: bool = False  # run detection, tracking and output on separate threads
+    queue_size: int = 2  # frames buffered in front of each stage
+    drop_policy: str = "latest"  # full queue: "latest" (keep only newest), "drop_oldest" or "block"
+    detect_batch_size: int = 1  # >1: detection runs on batches of up to this many frames (threaded pipeline only)
+    detect_batch_wait: float = 0.03  # seconds to wait for a batch to fill after its first frame
+    multiprocess: bool = False  # capture, detect+track and output in separate processes sharing frames via shared memory
 
 
 @dataclass
@@ -49,6 +130,15 @@ class AppSettings:
     video: VideoSettings = field(default_factory=VideoSettings)
     visualizer: VideoSettings = field(default_factory=Visualizer)
     network: NetworkSettings = field(default_factory=NetworkSettings)
+    pipeline: PipelineSettings = field(default_factory=PipelineSettings)
+    roi: RoiSettings = field(default_factory=RoiSettings)
+    schedule: DetectionScheduleSettings = field(default_factory=DetectionScheduleSettings)
+    motion_gate: MotionGateSettings = field(default_factory=MotionGateSettings)
+    resolution: ResolutionSettings = field(default_factory=ResolutionSettings)
 
     save_jsonl: bool = False
-    jsonl_path: str = "tracks.jsonl"
+    jsonl_path: str = "tracks.jsonl"  # segments are written as tracks_<date>-<time>.jsonl
+    jsonl_max_bytes: Optional[int] = 100 * 1024 * 1024  # start a new segment after this many bytes
+    jsonl_max_seconds: Optional[float] = 3600  # ... or after this many seconds
+    jsonl_compress: bool = False  # gzip closed segments
+    jsonl_queue_size: int = 1024  # records buffered for the writer thread before new ones are dropped
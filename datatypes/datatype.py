@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from typing import Tuple
 
+import numpy as np
+
 @dataclass
 class BBox:
     x1: int
@@ -20,3 +22,21 @@ class WorldPosition:
     y: float
     r: float
     conf: float
+
+
+# Columnar per-frame result: one row per tracked person, produced once per frame
+# by WorldPositionMapper and read column-wise by serialization and visualization.
+FRAME_RESULT_DTYPE = np.dtype([
+    ("id", np.int64),
+    ("x", np.float64),          # smoothed world position
+    ("y", np.float64),
+    ("dir", np.float64),        # heading in degrees
+    ("speed", np.float64),
+    ("conf", np.float64),
+    ("bbox", np.int32, (4,)),   # x1, y1, x2, y2 in pixels
+    ("foot", np.int32, (2,)),   # foot point in pixels
+])
+
+
+def empty_frame_result(n: int = 0) -> np.ndarray:
+    return np.zeros(n, dtype=FRAME_RESULT_DTYPE)
@@ -0,0 +1,280 @@
+import glob
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import cv2
+import numpy as np
+import supervision as sv
+
+from framesource.preprocess import Letterboxer
+
+BACKEND_ULTRALYTICS = "ultralytics"  # .pt (or anything ultralytics.YOLO loads), needs torch
+BACKEND_ONNXRUNTIME = "onnxruntime"  # .onnx exported by _setup_scripts/optimize_model.py
+BACKEND_OPENVINO = "openvino"        # *_openvino_model/ directory (or its .xml) from the same script
+BACKENDS = (BACKEND_ULTRALYTICS, BACKEND_ONNXRUNTIME, BACKEND_OPENVINO)
+
+# raw detections: (N, 6) float32 rows of [x1, y1, x2, y2, score, class], full-resolution pixels
+EMPTY_ROWS = np.empty((0, 6), dtype=np.float32)
+
+
+class DetectorBackend(ABC):
+    """
+    One way of running the YOLO model. Every backend produces raw (N, 6) rows
+    (detect_batch_raw) in full-resolution pixel coordinates, filtered by
+    confidence, class and NMS; detect()/detect_batch() wrap those rows in
+    sv.Detections for the callers that want them.
+
+    prepared is an optional framesource.preprocess.PreparedFrame of the frame
+    (letterboxed on the capture thread); backends use it instead of the frame
+    when its shape suits the model, and map the boxes back either way.
+    """
+
+    def __init__(self, settings):
+        self.conf = settings.conf_threshold
+        self.iou = settings.iou_threshold
+        self.imgsz = settings.imgsz
+        self.last_result = None  # raw model output of the last call, backend specific
+
+    def detect(self, frame, filter_class=None, prepared=None) -> sv.Detections:
+        return rows_to_detections(self.detect_raw(frame, filter_class, prepared))
+
+    def detect_batch(self, frames, filter_class=None, prepared=None) -> List[sv.Detections]:
+        return [rows_to_detections(rows) for rows in self.detect_batch_raw(frames, filter_class, prepared)]
+
+    def detect_raw(self, frame, filter_class=None, prepared=None) -> np.ndarray:
+        return self.detect_batch_raw([frame], filter_class, [prepared])[0]
+
+    @abstractmethod
+    def detect_batch_raw(self, frames, filter_class=None, prepared=None) -> List[np.ndarray]:
+        ...
+
+    def set_imgsz(self, imgsz: int) -> bool:
+        """Change the inference size between calls. False when the model input is fixed."""
+        self.imgsz = imgsz
+        return True
+
+
+class UltralyticsBackend(DetectorBackend):
+    """ultralytics.YOLO + torch, on the GPU when requested and available."""
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        from ultralytics import YOLO
+        import torch
+
+        self.model = YOLO(settings.model_path)
+
+        # TODO: flesh out what is exactly required? Pytorch lib had trouble installing because of pip temp path fucking up
+        # # try to move to GPU if available and requested
+        device = "cpu"
+        if settings.use_gpu:
+            if torch.cuda.is_available():
+                device = "cuda"
+            else:
+                print("[WARN] Detector defaulting to CPU while GPU was requested!")
+                device = "cpu"
+        try:
+            self.model.to(device)
+        except Exception:
+            print(f"[WARN] Detector failed to set model to {device}")
+        self.device = device
+
+    def detect_batch_raw(self, frames, filter_class=None, prepared=None) -> List[np.ndarray]:
+        if len(frames) == 0:
+            return []
+        if prepared is None:
+            prepared = [None] * len(frames)
+        sources = [frame if p is None else p.image for frame, p in zip(frames, prepared)]
+        source = sources[0] if len(sources) == 1 else sources
+        results = self.model.predict(source=source, verbose=False, conf=self.conf, iou=self.iou, classes=filter_class,
+                                     imgsz=self.imgsz, batch=len(sources))
+        self.last_result = results[0] if len(results) == 1 else results
+        # boxes.data is already [x1, y1, x2, y2, conf, cls]
+        return [_to_source(res.boxes.data.cpu().numpy().astype(np.float32), p) for res, p in zip(results, prepared)]
+
+
+class _ExportedModelBackend(DetectorBackend):
+    """
+    Shared pre/post-processing for exported YOLOv8/11 detection models:
+    letterbox to the model input, BGR -> RGB NCHW float, raw (B, 4 + classes, anchors)
+    output decoded, thresholded and NMS'ed per class with OpenCV.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.input_shape = None  # (h, w) when the model has a fixed input size
+        self.max_batch = None    # None = any batch size
+        self._letterbox = None
+        self._scratch = []       # letterbox buffers, reused per batch position
+
+    def _setup_input(self, shape):
+        """shape: model input shape (N, C, H, W); non-int entries are dynamic."""
+        n, _, h, w = shape
+        self.max_batch = n if isinstance(n, int) and n > 0 else None
+        if isinstance(h, int) and isinstance(w, int) and h > 0 and w > 0:
+            self.input_shape = (h, w)
+            self._letterbox = Letterboxer(max(h, w), square=True)
+        else:
+            self._letterbox = Letterboxer(self.imgsz)
+
+    def set_imgsz(self, imgsz: int) -> bool:
+        if self.input_shape is not None:
+            return False
+        self.imgsz = imgsz
+        self._letterbox = Letterboxer(imgsz)
+        return True
+
+    @abstractmethod
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        """Run the model on an NCHW float32 blob, return the raw output."""
+        ...
+
+    def detect_batch_raw(self, frames, filter_class=None, prepared=None) -> List[np.ndarray]:
+        if len(frames) == 0:
+            return []
+        if prepared is None:
+            prepared = [None] * len(frames)
+        inputs = [self._prepare(i, frame, p) for i, (frame, p) in enumerate(zip(frames, prepared))]
+
+        # one inference per group of equally shaped inputs that fits the model's batch size
+        results = [None] * len(inputs)
+        step = self.max_batch or len(inputs)
+        for start in range(0, len(inputs), step):
+            group = inputs[start:start + step]
+            shapes = {p.image.shape for p in group}
+            if len(shapes) > 1:
+                # tiles of different size on a dynamic model: run them one by one
+                outputs = [self._infer(self._blob([p]))[0] for p in group]
+            else:
+                outputs = self._infer(self._blob(group))
+            for i, (p, output) in enumerate(zip(group, outputs)):
+                results[start + i] = _to_source(self._decode(output, filter_class), p)
+        return results
+
+    def _prepare(self, i, frame, prepared):
+        if prepared is not None and self._fits(prepared.image.shape[:2]):
+            return prepared
+        if i >= len(self._scratch):
+            self._scratch.append(None)
+        self._scratch[i] = self._letterbox(frame, self._scratch[i])
+        return self._scratch[i]
+
+    def _fits(self, shape) -> bool:
+        if self.input_shape is not None:
+            return tuple(shape) == self.input_shape
+        return max(shape) == self.imgsz  # dynamic model: letterboxed at the current imgsz
+
+    @staticmethod
+    def _blob(prepared_frames) -> np.ndarray:
+        return cv2.dnn.blobFromImages([p.image for p in prepared_frames], scalefactor=1 / 255.0, swapRB=True)
+
+    def _decode(self, output: np.ndarray, filter_class) -> np.ndarray:
+        """(4 + classes, anchors) -> (N, 6) rows in model input pixels."""
+        predictions = output.T
+        scores = predictions[:, 4:]
+        if filter_class is not None:
+            keep_cls = np.asarray(filter_class)
+            class_id = keep_cls[np.argmax(scores[:, keep_cls], axis=1)]
+        else:
+            class_id = np.argmax(scores, axis=1)
+        confidence = scores[np.arange(len(scores)), class_id]
+
+        mask = confidence >= self.conf
+        if not np.any(mask):
+            return EMPTY_ROWS.copy()
+        boxes, confidence, class_id = predictions[mask, :4], confidence[mask], class_id[mask]
+
+        # cx, cy, w, h -> x, y, w, h for NMS, x1, y1, x2, y2 for the result
+        xywh = boxes.copy()
+        xywh[:, :2] -= xywh[:, 2:] / 2
+        keep = cv2.dnn.NMSBoxesBatched(xywh.tolist(), confidence.tolist(), class_id.tolist(), self.conf, self.iou)
+        keep = np.asarray(keep, dtype=np.intp).reshape(-1)
+        rows = np.empty((len(keep), 6), dtype=np.float32)
+        rows[:, :2] = xywh[keep, :2]
+        rows[:, 2:4] = xywh[keep, :2] + xywh[keep, 2:]
+        rows[:, 4] = confidence[keep]
+        rows[:, 5] = class_id[keep]
+        return rows
+
+
+class OnnxRuntimeBackend(_ExportedModelBackend):
+    """ONNX model on onnxruntime (CPU unless use_gpu and the CUDA provider is installed)."""
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if settings.num_threads:
+            options.intra_op_num_threads = settings.num_threads
+        providers = ["CPUExecutionProvider"]
+        if settings.use_gpu:
+            if "CUDAExecutionProvider" in ort.get_available_providers():
+                providers.insert(0, "CUDAExecutionProvider")
+            else:
+                print("[WARN] Detector defaulting to CPU while GPU was requested!")
+        self.session = ort.InferenceSession(settings.model_path, sess_options=options, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._setup_input(model_input.shape)
+        self.device = self.session.get_providers()[0]
+
+    def _infer(self, blob):
+        self.last_result = self.session.run(None, {self._input_name: blob})[0]
+        return self.last_result
+
+
+class OpenVinoBackend(_ExportedModelBackend):
+    """OpenVINO IR model (the *_openvino_model directory or its .xml) on the OpenVINO CPU plugin."""
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        import openvino as ov
+
+        path = settings.model_path
+        if os.path.isdir(path):
+            xml = glob.glob(os.path.join(path, "*.xml"))
+            if not xml:
+                raise FileNotFoundError(f"No OpenVINO .xml model in {path}")
+            path = xml[0]
+
+        core = ov.Core()
+        model = core.read_model(path)
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if settings.num_threads:
+            config["INFERENCE_NUM_THREADS"] = settings.num_threads
+        self.compiled = core.compile_model(model, "CPU", config)
+        shape = self.compiled.input(0).get_partial_shape()
+        self._setup_input([d.get_length() if d.is_static else None for d in shape])
+        self.device = "CPU"
+
+    def _infer(self, blob):
+        self.last_result = self.compiled(blob)[self.compiled.output(0)]
+        return self.last_result
+
+
+def create_backend(settings) -> DetectorBackend:
+    """Backend named by settings.backend (YOLOSettings)."""
+    backend = getattr(settings, "backend", BACKEND_ULTRALYTICS)
+    if backend == BACKEND_ULTRALYTICS:
+        return UltralyticsBackend(settings)
+    if backend == BACKEND_ONNXRUNTIME:
+        return OnnxRuntimeBackend(settings)
+    if backend == BACKEND_OPENVINO:
+        return OpenVinoBackend(settings)
+    raise ValueError(f"Unknown detector backend '{backend}', expected one of {BACKENDS}")
+
+
+def rows_to_detections(rows: np.ndarray) -> sv.Detections:
+    """(N, 6) rows -> sv.Detections (for the bytetrack path and the scripts)."""
+    if len(rows) == 0:
+        return sv.Detections.empty()
+    return sv.Detections(xyxy=rows[:, :4].copy(), confidence=rows[:, 4].copy(), class_id=rows[:, 5].astype(int))
+
+
+def _to_source(rows: np.ndarray, prepared: Optional[object]) -> np.ndarray:
+    if prepared is not None and len(rows) > 0:
+        rows[:, :4] = prepared.to_source(rows[:, :4])
+    return rows
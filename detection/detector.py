@@ -1,33 +1,50 @@
-import numpy as np
-from typing import Optional
+from detection.backends import create_backend
 
-from ultralytics import YOLO
-import supervision as sv
-import torch
 
 class PeopleDetector:
+    """
+    YOLO people detector; the model runs on the backend chosen in YOLOSettings.backend
+    (ultralytics/torch, onnxruntime or openvino, see detection/backends.py).
+    """
+
     def __init__(self, settings):
         self.conf = settings.conf_threshold
         self.iou = settings.iou_threshold
-        self.model = YOLO(settings.model_path)
-        use_gpu = settings.use_gpu
-
-        # TODO: flesh out what is exactly required? Pytorch lib had trouble installing because of pip temp path fucking up
-        # # try to move to GPU if available and requested
-        if use_gpu:
-            if torch.cuda.is_available():
-                device = "cuda"
-            else:
-                print("[WARN] Detector defaulting to CPU while GPU was requested!")
-                device = "cpu"
-        try:
-            self.model.to(device)
-        except Exception:
-            print(f"[WARN] Detector failed to set model to {device}")
-
-        print(f"PeopleDetector using device '{device}'.")
-
-    def detect(self, frame, filter_class):
-        res = self.model.predict(source=frame, verbose=False, conf=self.conf, iou=self.iou, classes=filter_class)[0]
-        det = sv.Detections.from_ultralytics(res)
-        return det, res
+        self.imgsz = settings.imgsz
+        self.backend = create_backend(settings)
+
+        print(f"PeopleDetector using backend '{settings.backend}' on '{self.backend.device}'.")
+
+    def detect(self, frame, filter_class, prepared=None):
+        """
+        prepared: optional framesource.preprocess.PreparedFrame of this frame (already
+        letterboxed to the model size on the capture thread). It is fed to the model
+        instead of the full frame and the boxes are mapped back to full-resolution
+        pixels; res (the backend's raw output) then still refers to the prepared image.
+        """
+        det = self.backend.detect(frame, filter_class, prepared)
+        return det, self.backend.last_result
+
+    def detect_batch(self, frames, filter_class, prepared=None):
+        """
+        Runs one batched inference over several frames (or tiles) and returns one
+        sv.Detections per input, in order. prepared is an optional list matching
+        frames, with the same meaning as in detect().
+        """
+        return self.backend.detect_batch(frames, filter_class, prepared)
+
+    def detect_raw(self, frame, filter_class, prepared=None):
+        """Like detect(), but the boxes come as (N, 6) float32 [x1, y1, x2, y2, score, class] rows."""
+        rows = self.backend.detect_raw(frame, filter_class, prepared)
+        return rows, self.backend.last_result
+
+    def detect_batch_raw(self, frames, filter_class, prepared=None):
+        """Like detect_batch(), with one (N, 6) row array per input."""
+        return self.backend.detect_batch_raw(frames, filter_class, prepared)
+
+    def set_imgsz(self, imgsz):
+        """Changes the inference size for the next calls; False when the model input size is fixed."""
+        if not self.backend.set_imgsz(imgsz):
+            return False
+        self.imgsz = imgsz
+        return True
@@ -0,0 +1,130 @@
+import csv
+import os
+import time
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+
+@dataclass
+class ResolutionChange:
+    frame_number: int
+    timestamp: float
+    imgsz: int
+    stride: int
+    frame_ms: float   # mean frame time of the window that triggered the change
+    reason: str       # "over budget" / "under budget"
+
+
+class ResolutionController:
+    """
+    Holds the per-frame processing time under a budget by trading detection quality.
+
+    observe() collects the frame times of `window` frames; when their mean is
+    over the budget the controller steps down (smaller imgsz, then a larger
+    detection stride once imgsz is at its minimum), when it stays below
+    `headroom` x budget for `patience` windows in a row it steps back up in the
+    reverse order. After every change the next window is discarded so the new
+    setting is measured on its own. Changes are printed, kept in .changes and
+    optionally appended to a CSV file.
+    """
+
+    def __init__(self, settings, detector, target_fps: float):
+        self.detector = detector
+        self.target_ms = settings.target_ms if settings.target_ms else 1000.0 / target_fps
+        self.min_imgsz = settings.min_imgsz
+        self.max_imgsz = settings.max_imgsz
+        self.step = settings.step
+        self.max_stride = max(1, settings.max_stride)
+        self.window = settings.window
+        self.headroom = settings.headroom
+        self.patience = settings.patience
+        self.log_path = settings.log_path
+
+        self.imgsz = min(max(detector.imgsz, self.min_imgsz), self.max_imgsz)
+        self.stride = 1
+        self.can_resize = detector.set_imgsz(self.imgsz)
+        if not self.can_resize:
+            print("[WARN] Detector has a fixed input size; the resolution controller only adjusts the detection stride.")
+
+        self._since_detect = 0
+        self._times = []
+        self._skip_window = False
+        self._calm_windows = 0
+        self.changes: List[ResolutionChange] = []
+
+    def should_detect(self, frame_number: int) -> bool:
+        """
+        Decide (and record) whether this frame goes through the detector: one of
+        every `stride` frames that reach the controller. Counted per call rather
+        than by frame_number % stride, since with skip_decode, FramePacer or
+        capture_stride the loop only sees every other (or every Nth) number.
+        """
+        self._since_detect += 1
+        if self.stride > 1 and self._since_detect < self.stride:
+            return False
+        self._since_detect = 0
+        return True
+
+    def observe(self, frame_number: int, frame_seconds: float):
+        self._times.append(1000.0 * frame_seconds)
+        if len(self._times) < self.window:
+            return
+        frame_ms = float(np.mean(self._times))
+        self._times.clear()
+        if self._skip_window:
+            self._skip_window = False
+            return
+
+        if frame_ms > self.target_ms:
+            self._calm_windows = 0
+            self._step_down(frame_number, frame_ms)
+        elif frame_ms < self.headroom * self.target_ms:
+            self._calm_windows += 1
+            if self._calm_windows >= self.patience:
+                self._calm_windows = 0
+                self._step_up(frame_number, frame_ms)
+        else:
+            self._calm_windows = 0
+
+    #
+    # Internals
+    #
+    def _step_down(self, frame_number, frame_ms):
+        if self.can_resize and self.imgsz > self.min_imgsz:
+            self._apply(frame_number, frame_ms, max(self.min_imgsz, self.imgsz - self.step), self.stride, "over budget")
+        elif self.stride < self.max_stride:
+            self._apply(frame_number, frame_ms, self.imgsz, self.stride + 1, "over budget")
+
+    def _step_up(self, frame_number, frame_ms):
+        if self.stride > 1:
+            self._apply(frame_number, frame_ms, self.imgsz, self.stride - 1, "under budget")
+        elif self.can_resize and self.imgsz < self.max_imgsz:
+            self._apply(frame_number, frame_ms, min(self.max_imgsz, self.imgsz + self.step), self.stride, "under budget")
+
+    def _apply(self, frame_number, frame_ms, imgsz, stride, reason):
+        print(f"[INFO] Resolution controller at frame {frame_number}: imgsz {self.imgsz} -> {imgsz}, "
+              f"detection stride {self.stride} -> {stride} ({reason}: {frame_ms:.1f} ms vs {self.target_ms:.1f} ms budget)")
+        if imgsz != self.imgsz:
+            self.detector.set_imgsz(imgsz)
+        self.imgsz = imgsz
+        self.stride = stride
+        self._skip_window = True
+
+        change = ResolutionChange(frame_number, time.time(), imgsz, stride, frame_ms, reason)
+        self.changes.append(change)
+        if self.log_path:
+            self._log(change)
+
+    def _log(self, change: ResolutionChange):
+        try:
+            new_file = not os.path.exists(self.log_path)
+            with open(self.log_path, "a", newline="") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(["frame_number", "timestamp", "imgsz", "stride", "frame_ms", "reason"])
+                writer.writerow([change.frame_number, f"{change.timestamp:.3f}", change.imgsz, change.stride,
+                                 f"{change.frame_ms:.2f}", change.reason])
+        except OSError as e:
+            print(f"[WARN] Could not write resolution log {self.log_path}: {e}")
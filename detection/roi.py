@@ -0,0 +1,253 @@
+import math
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from detection.backends import EMPTY_ROWS, rows_to_detections
+
+ROI_OFF = "off"
+ROI_CROP = "crop"    # one crop around the floor region
+ROI_TILES = "tiles"  # overlapping tiles over that crop, one batched predict, merged with cross-tile NMS
+ROI_MODES = (ROI_OFF, ROI_CROP, ROI_TILES)
+
+
+def load_floor_polygon(roi_settings, tracking_settings, frame_size: Tuple[int, int]) -> Optional[np.ndarray]:
+    """
+    Walkable floor as an (N, 2) int32 pixel polygon inside the frame.
+    Uses the polygon drawn in calibrate_floor.py (roi_path) when present, otherwise
+    the world rectangle world_bounds projected back through the inverse of H.npy.
+    Returns None when neither is available.
+    """
+    w, h = frame_size
+    try:
+        polygon = np.load(roi_settings.roi_path).astype(np.float32).reshape(-1, 2)
+        if len(polygon) < 3:
+            raise ValueError(f"polygon needs at least 3 points, got {len(polygon)}")
+        polygon[:, 0] = np.clip(polygon[:, 0], 0, w - 1)
+        polygon[:, 1] = np.clip(polygon[:, 1], 0, h - 1)
+        return np.round(polygon).astype(np.int32)
+    except Exception as e:
+        if roi_settings.world_bounds is None:
+            print(f"[WARN] Could not load floor polygon from {roi_settings.roi_path} ({e}) and no world_bounds set.")
+            return None
+
+    try:
+        H = np.load(tracking_settings.homography_path)
+    except Exception as e:
+        print(f"[WARN] Could not load homography from {tracking_settings.homography_path} ({e}); floor ROI disabled.")
+        return None
+    x_min, y_min, x_max, y_max = roi_settings.world_bounds
+    corners = np.array([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]], dtype=np.float64)
+    # H maps pixels -> meters; the floor rectangle maps back to a convex quad
+    # unless it reaches past the horizon, where the projective w turns negative
+    homogeneous = np.hstack([corners, np.ones((4, 1))]) @ np.linalg.inv(H).T
+    if np.any(homogeneous[:, 2] <= 0):
+        print("[WARN] world_bounds reach past the camera horizon; floor ROI disabled.")
+        return None
+    quad = cv2.convexHull((homogeneous[:, :2] / homogeneous[:, 2:]).astype(np.float32))
+
+    frame_rect = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]], dtype=np.float32)
+    area, clipped = cv2.intersectConvexConvex(quad, frame_rect)
+    if area <= 0 or clipped is None:
+        print("[WARN] world_bounds lie outside the camera view; floor ROI disabled.")
+        return None
+    return np.round(clipped.reshape(-1, 2)).astype(np.int32)
+
+
+def tile_grid(rect: Tuple[int, int, int, int], tile_size: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    """Evenly spaced (x0, y0, x1, y1) tiles of at most tile_size covering rect, neighbours overlapping by >= overlap."""
+    x0, y0, x1, y1 = rect
+
+    def starts(lo, hi):
+        length = hi - lo
+        if length <= tile_size:
+            return [(lo, hi)]
+        n = math.ceil((length - overlap) / (tile_size - overlap))
+        step = (length - tile_size) / (n - 1)
+        return [(lo + int(round(i * step)), lo + int(round(i * step)) + tile_size) for i in range(n)]
+
+    return [(tx0, ty0, tx1, ty1) for ty0, ty1 in starts(y0, y1) for tx0, tx1 in starts(x0, x1)]
+
+
+def merge_tile_rows(parts: List[np.ndarray], tiles, iou_threshold: float, ios_threshold: float = 0.6) -> np.ndarray:
+    """
+    Merge per-tile (N, 6) detection rows (already in frame coordinates).
+    Plain IoU NMS removes the duplicates from overlapping tiles; a box that
+    touches an inner tile edge (a person cut off by the tile) is also dropped
+    when it lies mostly inside a more confident box from another tile.
+    """
+    parts = [(i, d) for i, d in enumerate(parts) if len(d) > 0]
+    if not parts:
+        return EMPTY_ROWS.copy()
+
+    rows = np.concatenate([d for _, d in parts])
+    tile_idx = np.concatenate([np.full(len(d), i) for i, d in parts])
+    xyxy = rows[:, :4]
+    conf = rows[:, 4]
+
+    # does each box touch a tile edge that is not also the crop edge?
+    tiles = np.asarray(tiles, dtype=np.float32)
+    outer = np.array([tiles[:, 0].min(), tiles[:, 1].min(), tiles[:, 2].max(), tiles[:, 3].max()])
+    own = tiles[tile_idx]
+    margin = 2.0
+    cut = np.zeros(len(rows), dtype=bool)
+    for k in range(4):
+        at_edge = np.abs(xyxy[:, k] - own[:, k]) <= margin
+        inner_edge = np.abs(own[:, k] - outer[k]) > margin
+        cut |= at_edge & inner_edge
+
+    area = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+    ix0 = np.maximum(xyxy[:, None, 0], xyxy[None, :, 0])
+    iy0 = np.maximum(xyxy[:, None, 1], xyxy[None, :, 1])
+    ix1 = np.minimum(xyxy[:, None, 2], xyxy[None, :, 2])
+    iy1 = np.minimum(xyxy[:, None, 3], xyxy[None, :, 3])
+    inter = np.clip(ix1 - ix0, 0, None) * np.clip(iy1 - iy0, 0, None)
+    iou = inter / np.maximum(area[:, None] + area[None, :] - inter, 1e-9)
+    ios = inter / np.maximum(np.minimum(area[:, None], area[None, :]), 1e-9)
+    other_tile = tile_idx[:, None] != tile_idx[None, :]
+
+    keep = np.ones(len(rows), dtype=bool)
+    for i in np.argsort(-conf):
+        if not keep[i]:
+            continue
+        # i survives; suppress what it covers
+        suppress = iou[i] > iou_threshold
+        suppress |= other_tile[i] & cut & (ios[i] > ios_threshold)
+        suppress[i] = False
+        keep &= ~suppress
+    return rows[keep]
+
+
+class RoiDetector:
+    """
+    Runs a PeopleDetector on the floor region only.
+
+    crop:  one crop around the floor polygon plus head room above it, so the
+           ceiling and walls are never sent to the model.
+    tiles: that crop split into overlapping tiles run as one batch; each tile is
+           scaled to the model size on its own, so small (distant) people get a
+           higher effective resolution. Results are merged with cross-tile NMS.
+
+    Detections whose foot point is not on the floor polygon are dropped. The
+    layout is computed from the first frame, so it follows the camera resolution.
+    Same detect()/detect_batch()/detect_raw()/detect_batch_raw() interface as
+    PeopleDetector; res is always None.
+    """
+
+    def __init__(self, detector, roi_settings, tracking_settings):
+        self.detector = detector
+        self.settings = roi_settings
+        self.tracking_settings = tracking_settings
+        self.mode = roi_settings.mode
+        if self.mode not in ROI_MODES:
+            raise ValueError(f"Unknown ROI mode '{self.mode}', expected one of {ROI_MODES}")
+
+        self._frame_size = None
+        self.polygon = None
+        self.crop = None      # (x0, y0, x1, y1) in frame pixels
+        self.tiles = None
+        self._floor_mask = None
+
+        self.frames = 0
+        self.pixels_in = 0    # frame pixels the model looked at
+
+    def detect(self, frame, filter_class, prepared=None):
+        self._ensure_layout(frame)
+        if self.crop is None:
+            return self.detector.detect(frame, filter_class, prepared)
+        return rows_to_detections(self.detect_batch_raw([frame], filter_class)[0]), None
+
+    def detect_batch(self, frames, filter_class, prepared=None):
+        if len(frames) == 0:
+            return []
+        self._ensure_layout(frames[0])
+        if self.crop is None:
+            return self.detector.detect_batch(frames, filter_class, prepared)
+        return [rows_to_detections(rows) for rows in self.detect_batch_raw(frames, filter_class)]
+
+    def detect_raw(self, frame, filter_class, prepared=None):
+        self._ensure_layout(frame)
+        if self.crop is None:
+            return self.detector.detect_raw(frame, filter_class, prepared)
+        return self.detect_batch_raw([frame], filter_class)[0], None
+
+    def detect_batch_raw(self, frames, filter_class, prepared=None):
+        if len(frames) == 0:
+            return []
+        self._ensure_layout(frames[0])
+        if self.crop is None:
+            return self.detector.detect_batch_raw(frames, filter_class, prepared)
+
+        # all tiles of all frames in one predict
+        views = [frame[y0:y1, x0:x1] for frame in frames for (x0, y0, x1, y1) in self.tiles]
+        parts = self.detector.detect_batch_raw(views, filter_class)
+        n = len(self.tiles)
+
+        results = []
+        for f in range(len(frames)):
+            frame_parts = parts[f * n:(f + 1) * n]
+            for rows, (x0, y0, _, _) in zip(frame_parts, self.tiles):
+                rows[:, :4] += np.array([x0, y0, x0, y0], dtype=rows.dtype)
+            if n == 1:
+                rows = frame_parts[0]
+            else:
+                rows = merge_tile_rows(frame_parts, self.tiles, self.detector.iou)
+            results.append(self._on_floor(rows))
+            self.frames += 1
+            self.pixels_in += sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in self.tiles)
+        return results
+
+    @property
+    def pixel_fraction(self) -> float:
+        """Share of the full frame's pixels sent to the model (above 1 when tiles overlap a lot)."""
+        if not self.frames or self._frame_size is None:
+            return 1.0
+        w, h = self._frame_size
+        return self.pixels_in / (self.frames * w * h)
+
+    #
+    # Layout
+    #
+    def _ensure_layout(self, frame):
+        h, w = frame.shape[:2]
+        if self._frame_size == (w, h):
+            return
+        self._frame_size = (w, h)
+        self.crop = self.tiles = self._floor_mask = None
+        if self.mode == ROI_OFF:
+            return
+
+        self.polygon = load_floor_polygon(self.settings, self.tracking_settings, (w, h))
+        if self.polygon is None:
+            print("[WARN] No floor region available, detecting on the full frame.")
+            return
+
+        x, y, bw, bh = cv2.boundingRect(self.polygon)
+        margin = self.settings.margin
+        self.crop = (max(0, x - margin), max(0, y - self.settings.head_room),
+                     min(w, x + bw + margin), min(h, y + bh + margin))
+
+        if self.mode == ROI_TILES:
+            self.tiles = tile_grid(self.crop, self.settings.tile_size, self.settings.tile_overlap)
+        else:
+            self.tiles = [self.crop]
+
+        # feet may sit a little outside the drawn polygon (bbox bottoms are not exact)
+        mask = np.zeros((h, w), dtype=np.uint8)
+        cv2.fillPoly(mask, [self.polygon.reshape(-1, 1, 2)], 1)
+        if margin > 0:
+            mask = cv2.dilate(mask, np.ones((2 * margin + 1, 2 * margin + 1), dtype=np.uint8))
+        self._floor_mask = mask
+
+        crop_px = (self.crop[2] - self.crop[0]) * (self.crop[3] - self.crop[1])
+        print(f"Floor ROI ({self.mode}): crop {self.crop}, {len(self.tiles)} tile(s), "
+              f"{100.0 * crop_px / (w * h):.0f}% of the frame")
+
+    def _on_floor(self, rows: np.ndarray) -> np.ndarray:
+        if len(rows) == 0:
+            return rows
+        h, w = self._floor_mask.shape
+        fx = np.clip(((rows[:, 0] + rows[:, 2]) / 2).astype(np.intp), 0, w - 1)
+        fy = np.clip(rows[:, 3].astype(np.intp), 0, h - 1)
+        return rows[self._floor_mask[fy, fx] > 0]
@@ -1,108 +1,143 @@
-import math
 import numpy as np
-from typing import Dict, Tuple
+from typing import Optional, Tuple
+
+from filters.track_state import TrackStateStore
 
 
 class KalmanSmoother:
     """
-    A 2D Kalman filter with direction stabilization.
-    State: [x, y, vx, vy]
+    A batched 2D Kalman filter with direction stabilization.
+    State per track: [x, y, vx, vy]
+
+    All tracks live in contiguous arrays (state (N,4), covariance (N,4,4)),
+    so one call to update_batch() predicts and corrects every track seen
+    in a frame in a single vectorized step.
     """
 
-    def __init__(self, movement_threshold: float = 0.3):
+    def __init__(self, movement_threshold: float = 0.3, capacity: int = 64, ttl: Optional[float] = 1.0,
+                 ttl_frames: Optional[int] = None):
         # Below this speed we consider the person "stationary"
         self.movement_threshold = movement_threshold
-        self.filters: Dict[int, Dict[str, np.ndarray]] = {}
-        self.last_direction: Dict[int, float] = {}  # stored per track
-
-    def _init_filter(self, x: float, y: float, t: float):
-        kf = {}
-        kf["x"] = np.array([[x], [y], [0.0], [0.0]], dtype=float)
-        kf["P"] = np.eye(4) * 100.0
-        kf["H"] = np.array([[1, 0, 0, 0],
-                            [0, 1, 0, 0]], dtype=float)
-        kf["R"] = np.eye(2) * 10.0
-        kf["Q_base"] = np.array([[1, 0, 0, 0],
-                                 [0, 1, 0, 0],
-                                 [0, 0, 10, 0],
-                                 [0, 0, 0, 10]], dtype=float)
-        kf["last_t"] = t
-        return kf
 
-    def update(self, track_id: int, x: float, y: float, t: float) -> Tuple[float, float, float, float]:
-        """
-        Returns smoothed_x, smoothed_y, speed, direction(deg)
-        """
+        # per-track state, reused across tracks and evicted after ttl seconds / ttl_frames frames
+        self.store = TrackStateStore(capacity=capacity, ttl=ttl, ttl_frames=ttl_frames)
 
-        # ----------------------------------------------------
-        # Initialize new track
-        # ----------------------------------------------------
-        if track_id not in self.filters:
-            self.filters[track_id] = self._init_filter(x, y, t)
-            self.last_direction[track_id] = 0.0
-            return x, y, 0.0, 0.0
+        self.P0 = 100.0                                   # initial covariance (diagonal)
+        self.R = 10.0                                     # measurement noise (diagonal)
+        self.Q = np.diag([1.0, 1.0, 10.0, 10.0])          # process noise
 
-        kf = self.filters[track_id]
+    def update_batch(self, track_ids, xs, ys, t: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Predict + update all given tracks at time t.
 
-        # ----------------------------------------------------
-        # Compute dt
-        # ----------------------------------------------------
-        dt = t - kf["last_t"]
-        if dt <= 0:
-            state = kf["x"]
-            vx, vy = state[2, 0], state[3, 0]
-            speed = math.hypot(vx, vy)
-            direction = self.last_direction[track_id]
-            return state[0, 0], state[1, 0], speed, direction
+        Args:
+            track_ids: (N,) tracker ids
+            xs, ys: (N,) measured world positions
+            t: current time in seconds
+
+        Returns:
+            (smoothed_x, smoothed_y, speed, direction(deg)) as (N,) arrays
+        """
+        track_ids = np.asarray(track_ids, dtype=np.int64).reshape(-1)
+        z = np.column_stack((np.asarray(xs, dtype=float).reshape(-1),
+                             np.asarray(ys, dtype=float).reshape(-1)))
 
-        kf["last_t"] = t
+        st = self.store
+        st.advance()
+        st.evict_expired(t)
+        slots, is_new = st.lookup(track_ids)
+        st.last_frame[slots] = st.frame
 
         # ----------------------------------------------------
-        # PREDICTION
+        # Initialize new tracks
         # ----------------------------------------------------
-        F = np.array([[1, 0, dt, 0],
-                      [0, 1, 0, dt],
-                      [0, 0, 1,  0],
-                      [0, 0, 0,  1]], dtype=float)
-
-        x_pred = F @ kf["x"]
-        P_pred = F @ kf["P"] @ F.T + kf["Q_base"]
+        if is_new.any():
+            s = slots[is_new]
+            st.x[s, :2] = z[is_new]
+            st.x[s, 2:] = 0.0
+            st.P[s] = np.eye(4) * self.P0
+            st.last_t[s] = t
+            st.last_direction[s] = 0.0
 
         # ----------------------------------------------------
-        # UPDATE (x, y)
+        # Compute dt; tracks with dt <= 0 keep their current state
         # ----------------------------------------------------
-        z = np.array([[x], [y]], dtype=float)
-        H = kf["H"]
-
-        y_residual = z - H @ x_pred
-        S = H @ P_pred @ H.T + kf["R"]
-        K = P_pred @ H.T @ np.linalg.inv(S)
-
-        x_new = x_pred + K @ y_residual
-        P_new = (np.eye(4) - K @ H) @ P_pred
-
-        kf["x"] = x_new
-        kf["P"] = P_new
+        dt = t - st.last_t[slots]
+        active = ~is_new & (dt > 0)
+
+        if active.any():
+            s = slots[active]
+            dt_a = dt[active]
+            st.last_t[s] = t
+
+            # ------------------------------------------------
+            # PREDICTION (F = I + dt * [0 I; 0 0])
+            # ------------------------------------------------
+            x_pred = st.x[s].copy()
+            x_pred[:, :2] += x_pred[:, 2:] * dt_a[:, None]
+
+            F = np.broadcast_to(np.eye(4), (len(s), 4, 4)).copy()
+            F[:, 0, 2] = dt_a
+            F[:, 1, 3] = dt_a
+            P_pred = F @ st.P[s] @ F.transpose(0, 2, 1) + self.Q
+
+            # ------------------------------------------------
+            # UPDATE (x, y); H selects the position rows
+            # ------------------------------------------------
+            y_residual = z[active] - x_pred[:, :2]
+
+            a = P_pred[:, 0, 0] + self.R
+            b = P_pred[:, 0, 1]
+            c = P_pred[:, 1, 0]
+            d = P_pred[:, 1, 1] + self.R
+            det = a * d - b * c
+
+            # closed-form 2x2 inverse of S = H P H^T + R
+            S_inv = np.empty((len(s), 2, 2))
+            S_inv[:, 0, 0] = d / det
+            S_inv[:, 0, 1] = -b / det
+            S_inv[:, 1, 0] = -c / det
+            S_inv[:, 1, 1] = a / det
+
+            K = P_pred[:, :, :2] @ S_inv                               # (M,4,2)
+            st.x[s] = x_pred + (K @ y_residual[:, :, None])[:, :, 0]
+            st.P[s] = P_pred - K @ P_pred[:, :2, :]                  # (I - K H) P
 
         # ----------------------------------------------------
         # COMPUTE OUTPUT
         # ----------------------------------------------------
-        Xs = x_new[0, 0]
-        Ys = x_new[1, 0]
-        vx = x_new[2, 0]
-        vy = x_new[3, 0]
+        state = st.x[slots]
+        xs_out = state[:, 0].copy()
+        ys_out = state[:, 1].copy()
+        vx, vy = state[:, 2], state[:, 3]
+
+        speed = np.hypot(vx, vy)
 
-        speed = math.hypot(vx, vy)
+        # new tracks report the raw measurement without motion
+        xs_out[is_new] = z[is_new, 0]
+        ys_out[is_new] = z[is_new, 1]
+        speed[is_new] = 0.0
 
         # ----------------------------------------------------
         # DIRECTION STABILIZATION
         # ----------------------------------------------------
-        if speed < self.movement_threshold:
-            # Object is basically stationary → freeze direction
-            direction = self.last_direction[track_id]
-        else:
-            # Compute new direction from velocity
-            direction = (math.degrees(math.atan2(vy, vx)) + 360.0) % 360.0
-            self.last_direction[track_id] = direction
-
-        return Xs, Ys, speed, direction
+        # Objects that are basically stationary keep their previous direction
+        moving = active & (speed >= self.movement_threshold)
+        if moving.any():
+            st.last_direction[slots[moving]] = (np.degrees(np.arctan2(vy[moving], vx[moving])) + 360.0) % 360.0
+        direction = st.last_direction[slots]
+
+        return xs_out, ys_out, speed, direction
+
+    def skip(self, t: float):
+        """A frame without tracks: only ages the stored ones."""
+        self.store.advance()
+        self.store.evict_expired(t)
+
+    def update(self, track_id: int, x: float, y: float, t: float) -> Tuple[float, float, float, float]:
+        """
+        Single-track convenience wrapper around update_batch().
+        Returns smoothed_x, smoothed_y, speed, direction(deg)
+        """
+        xs, ys, speed, direction = self.update_batch([track_id], [x], [y], t)
+        return float(xs[0]), float(ys[0]), float(speed[0]), float(direction[0])
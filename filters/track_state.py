@@ -0,0 +1,110 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class TrackStateStats:
+    live: int
+    evicted: int
+    total: int
+    capacity: int
+
+
+class TrackStateStore:
+    """
+    Preallocated pool of per-track filter state.
+
+    Rows are handed out per tracker_id and returned to a free list once a
+    track has not been updated for `ttl` seconds, or for more than
+    `ttl_frames` frames (counted by advance()), so memory stays flat no
+    matter how many (ever increasing) tracker ids pass by.
+    """
+
+    def __init__(self, capacity: int = 64, ttl: Optional[float] = 1.0, ttl_frames: Optional[int] = None):
+        self.ttl = ttl
+        self.ttl_frames = ttl_frames
+        self.frame = 0
+
+        self.x = np.zeros((capacity, 4), dtype=float)
+        self.P = np.zeros((capacity, 4, 4), dtype=float)
+        self.last_t = np.zeros(capacity, dtype=float)
+        self.last_frame = np.zeros(capacity, dtype=np.int64)
+        self.last_direction = np.zeros(capacity, dtype=float)
+        self.ids = np.full(capacity, -1, dtype=np.int64)  # -1 marks a free row
+
+        self._index: Dict[int, int] = {}  # tracker_id -> row
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+        self.evicted = 0
+        self.total = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.ids)
+
+    @property
+    def live(self) -> int:
+        return len(self._index)
+
+    def _grow(self):
+        old_capacity = self.capacity
+        capacity = 2 * old_capacity
+        for name in ("x", "P", "last_t", "last_frame", "last_direction", "ids"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:old_capacity] = old
+            setattr(self, name, new)
+        self.ids[old_capacity:] = -1
+        self._free.extend(range(capacity - 1, old_capacity - 1, -1))
+
+    def lookup(self, track_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map tracker ids to rows, allocating rows for unknown ids.
+        Returns (slots, is_new).
+        """
+        slots = np.empty(len(track_ids), dtype=np.intp)
+        is_new = np.zeros(len(track_ids), dtype=bool)
+        for i, track_id in enumerate(track_ids.tolist()):
+            slot = self._index.get(track_id)
+            if slot is None:
+                if not self._free:
+                    self._grow()
+                slot = self._free.pop()
+                self._index[track_id] = slot
+                self.ids[slot] = track_id
+                self.total += 1
+                is_new[i] = True
+            slots[i] = slot
+        return slots, is_new
+
+    def advance(self):
+        """Count one frame (one tracker update) for ttl_frames."""
+        self.frame += 1
+
+    def evict_expired(self, now: float) -> int:
+        """Free every row whose track was last updated more than ttl seconds (or ttl_frames frames) ago."""
+        if self.ttl is None and self.ttl_frames is None:
+            return 0
+
+        stale = np.zeros(self.capacity, dtype=bool)
+        if self.ttl is not None:
+            stale |= now - self.last_t > self.ttl
+        if self.ttl_frames is not None:
+            stale |= self.frame - self.last_frame > self.ttl_frames
+        expired = np.flatnonzero((self.ids >= 0) & stale)
+        for slot in expired.tolist():
+            del self._index[int(self.ids[slot])]
+            self._free.append(slot)
+        self.ids[expired] = -1
+
+        self.evicted += len(expired)
+        return len(expired)
+
+    def stats(self) -> TrackStateStats:
+        return TrackStateStats(
+            live=self.live,
+            evicted=self.evicted,
+            total=self.total,
+            capacity=self.capacity
+        )
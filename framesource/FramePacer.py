@@ -2,33 +2,44 @@ import time
 
 class FramePacer:
     """
-    Non-blocking frame pacer as a context manager.
+    Deadline-based frame pacer as a context manager.
+    Entering sleeps until the next processing slot, so the loop idles
+    instead of spinning. When processing overruns by more than a slot the
+    schedule is re-anchored to now rather than bursting to catch up.
     Usage:
         pacer = FramePacer(target_fps=30)
         while running:
-            frame, frame_number = source.read()
-            if frame is None:
-                continue
-
-            with pacer as should_process:
-                if not should_process:
-                    continue  # skip this frame
+            with pacer:
+                frame, frame_number = source.wait_next(last_frame_number, timeout=0.5)
+                if frame is None:
+                    continue
 
                 # --- detection / tracking / processing ---
     """
     def __init__(self, target_fps: float):
         self.target_interval = 1.0 / target_fps
-        self._last_process_time = time.perf_counter()
+        self._next_deadline = None
         self.should_process = True
 
-    def __enter__(self):
+    def wait(self):
+        """Sleep until the next slot."""
+        now = time.perf_counter()
+        if self._next_deadline is None:
+            self._next_deadline = now
+
+        delay = self._next_deadline - now
+        if delay > 0:
+            time.sleep(delay)
+
+        self._next_deadline += self.target_interval
         now = time.perf_counter()
-        elapsed = now - self._last_process_time
-        if elapsed >= self.target_interval:
-            self.should_process = True
-            self._last_process_time = now
-        else:
-            self.should_process = False
+        if self._next_deadline < now:
+            # fell more than a slot behind: start a fresh schedule
+            self._next_deadline = now + self.target_interval
+
+    def __enter__(self):
+        self.wait()
+        self.should_process = True
         return self.should_process
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -3,20 +3,39 @@ import threading
 import time
 from abc import ABC, abstractmethod
 
+from .ring import FrameRing
+
 
 class FrameSource(ABC):
     """
     Threaded frame source.
     Provides frames and a running frame counter.
+    Frames are decoded into a fixed ring of reusable buffers; consumers
+    borrow them through wait_next() and release the lease when done.
     """
 
-    def __init__(self):
+    def __init__(self, ring_size: int = 8):
         self.frame_number = 0
         self._running = False
         self._thread = None
 
         self._latest_frame = None
         self._latest_frame_number = None
+        # notified whenever a new frame is published or the capture thread stops
+        self._frame_cond = threading.Condition()
+
+        self.ring = FrameRing(ring_size)
+        self._scratch = None  # decode target when every ring slot is leased
+        self.preprocessor = None  # e.g. preprocess.Letterboxer, run on every published frame
+
+        # consumer demand: frames that will not be used are only grabbed, not decoded
+        self.demand_fps = None
+        self.demand_stride = 1
+        self._last_decode_time = None
+        self._grab_interval = None  # EMA of the time between captured frames
+        self._last_grab_time = None
+        self.decoded = 0
+        self.skipped = 0
 
     @property
     def is_alive(self):
@@ -40,38 +59,158 @@ class FrameSource(ABC):
     def stop(self):
         print("Stop the capture thread.")
         self._running = False
+        with self._frame_cond:
+            self._frame_cond.notify_all()
         if self._thread:
             self._thread.join(timeout=1)
         self.release()
 
+    def set_demand(self, fps=None, stride=1):
+        """
+        Tell the source how many frames the consumer will actually use.
+        fps: decode at most this many frames per second (live sources), skipping the rest.
+        stride: decode only every stride-th frame (useful for offline files).
+        """
+        self.demand_fps = fps
+        self.demand_stride = max(1, int(stride))
+
+    def set_preprocessor(self, preprocessor):
+        """
+        preprocessor(frame, previous) -> PreparedFrame, run on the capture thread for
+        every published frame; previous is the slot's last result, to be reused.
+        The result is available on the lease as .prepared.
+        """
+        self.preprocessor = preprocessor
+
+    def read_blocking(self, out=None):
+        """
+        Synchronously decode the next frame without the capture thread (do not mix with start()).
+        Decodes into out when it has the right shape, otherwise returns a new array; None at end of stream.
+        """
+        frame = self._read_frame_blocking(out)
+        if frame is not None:
+            self.frame_number += 1
+            self.decoded += 1
+        return frame
+
     def read(self):
         """
         Non-blocking: returns the most recent (frame, frame_number).
         Returns (None, None) if no frame has arrived yet.
+        The frame is not leased and its buffer may be reused by the capture thread;
+        use wait_next() when the frame is needed for longer than a moment.
         """
         return self._latest_frame, self._latest_frame_number
 
+    def wait_next(self, after_frame_number=None, timeout=None):
+        """
+        Blocking: waits until a frame newer than after_frame_number arrives
+        and returns it as a FrameLease (.frame, .frame_number, .release()).
+        Returns None on timeout or when the source stopped.
+        """
+        def has_new_frame():
+            n = self._latest_frame_number
+            return n is not None and (after_frame_number is None or n > after_frame_number)
+
+        with self._frame_cond:
+            self._frame_cond.wait_for(lambda: has_new_frame() or not self._running, timeout)
+            if not has_new_frame():
+                return None
+            return self.ring.lease_latest()
+
     #
     # Internal loop
     #
     def _capture_loop(self):
         while self._running:
-            frame = self._read_frame_blocking()
+            n_skip = self._frames_to_skip()
+            if n_skip:
+                if not self._skip_frames(n_skip):
+                    self._running = False
+                    with self._frame_cond:
+                        self._frame_cond.notify_all()
+                    break
+                self.frame_number += n_skip
+                self.skipped += n_skip
+                self._note_grab()
+                continue
+
+            slot = self.ring.acquire_write()
+            out = self.ring.buffers[slot] if slot is not None else self._scratch
+
+            frame = self._read_frame_blocking(out)
             if frame is None:
                 # File ended or camera error
                 self._running = False
+                with self._frame_cond:
+                    self._frame_cond.notify_all()
                 break
 
             self.frame_number += 1
-            self._latest_frame = frame
-            self._latest_frame_number = self.frame_number
+            self.decoded += 1
+            self._note_grab()
+            self._last_decode_time = time.perf_counter()
+            if slot is None:
+                # every slot is still leased: keep the camera drained but drop this frame
+                if frame is not self._scratch:
+                    self.ring.note_allocation(frame)
+                    self._scratch = frame
+                continue
+
+            prepared = None
+            if self.preprocessor is not None:
+                prepared = self.preprocessor(frame, self.ring.prepared[slot])
+
+            with self._frame_cond:
+                self.ring.commit(slot, frame, self.frame_number, prepared)
+                self._latest_frame = frame
+                self._latest_frame_number = self.frame_number
+                self._frame_cond.notify_all()
+
+    def _frames_to_skip(self) -> int:
+        """Number of upcoming frames the consumer will not use."""
+        if self.demand_stride > 1 and self.decoded and (self.frame_number % self.demand_stride):
+            return self.demand_stride - (self.frame_number % self.demand_stride)
+
+        if self.demand_fps and self._last_decode_time is not None:
+            # skip the next frame if it would arrive clearly (more than half a frame) before the consumer's next slot
+            grab = self._grab_interval or 0.0
+            next_arrival = time.perf_counter() - self._last_decode_time + grab
+            if next_arrival < 1.0 / self.demand_fps - 0.5 * grab:
+                return 1
+        return 0
+
+    def _note_grab(self):
+        now = time.perf_counter()
+        if self._last_grab_time is not None:
+            dt = now - self._last_grab_time
+            self._grab_interval = dt if self._grab_interval is None else 0.9 * self._grab_interval + 0.1 * dt
+        self._last_grab_time = now
+
+    def _skip_frames(self, n: int) -> bool:
+        """Advance past n frames without decoding them. Returns False at end of stream / on error."""
+        for _ in range(n):
+            if not self._grab():
+                return False
+        return True
+
+    def _grab(self) -> bool:
+        """Advance one frame without decoding. Sources without a cheaper path decode and discard."""
+        frame = self._read_frame_blocking(self._scratch)
+        if frame is None:
+            return False
+        self._scratch = frame
+        return True
 
     #
     # Methods subclasses must implement
     #
     @abstractmethod
-    def _read_frame_blocking(self):
-        """Return a raw frame or None."""
+    def _read_frame_blocking(self, out=None):
+        """
+        Return a raw frame or None.
+        When out is given (a buffer of a previous frame), decode into it and return it.
+        """
         ...
 
     @abstractmethod
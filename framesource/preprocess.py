@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+
+class PreparedFrame:
+    """
+    A frame resized + letterboxed to the detector's input size.
+    image = resize(frame, scale) placed at (pad_x, pad_y) on a padded canvas.
+    """
+    __slots__ = ("image", "scale", "pad_x", "pad_y", "source_shape")
+
+    def __init__(self, image, scale, pad_x, pad_y, source_shape):
+        self.image = image
+        self.scale = scale
+        self.pad_x = pad_x
+        self.pad_y = pad_y
+        self.source_shape = source_shape  # (h, w) of the full-resolution frame
+
+    def to_source(self, xyxy: np.ndarray) -> np.ndarray:
+        """Map (N, 4) boxes in image coordinates back to full-resolution pixel coordinates."""
+        boxes = (np.asarray(xyxy, dtype=np.float32) - (self.pad_x, self.pad_y, self.pad_x, self.pad_y)) / self.scale
+        h, w = self.source_shape
+        np.clip(boxes[:, 0::2], 0, w, out=boxes[:, 0::2])
+        np.clip(boxes[:, 1::2], 0, h, out=boxes[:, 1::2])
+        return boxes
+
+
+class Letterboxer:
+    """
+    Downscales frames to fit size x size and pads to a multiple of stride
+    (1920x1080 -> 640x384 for size 640), the same minimal-padding shape
+    ultralytics would pick itself, so it does no further resizing.
+    Runs on the capture thread and writes into the buffer of the previous
+    PreparedFrame of the same ring slot instead of allocating.
+    With square=True it always pads to size x size, for exported models with a fixed input shape.
+    """
+
+    def __init__(self, size: int = 640, stride: int = 32, pad_value: int = 114, square: bool = False):
+        self.size = size
+        self.stride = stride
+        self.pad_value = pad_value
+        self.square = square
+        self._geometry = {}  # (h, w) -> (scale, new_w, new_h, out_w, out_h, pad_x, pad_y)
+
+    def __call__(self, frame: np.ndarray, prepared: PreparedFrame = None) -> PreparedFrame:
+        h, w = frame.shape[:2]
+        geometry = self._geometry.get((h, w))
+        if geometry is None:
+            geometry = self._geometry[(h, w)] = self._compute_geometry(h, w)
+        scale, new_w, new_h, out_w, out_h, pad_x, pad_y = geometry
+
+        out_shape = (out_h, out_w) + frame.shape[2:]
+        if prepared is None or prepared.image.shape != out_shape or prepared.image.dtype != frame.dtype:
+            # the padding is only ever written here; the resize below never touches it
+            prepared = PreparedFrame(np.full(out_shape, self.pad_value, dtype=frame.dtype), scale, pad_x, pad_y, (h, w))
+
+        roi = prepared.image[pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+        if (new_w, new_h) == (w, h):
+            roi[:] = frame
+        else:
+            # INTER_LINEAR like ultralytics, so the model sees the same pixels as before
+            cv2.resize(frame, (new_w, new_h), dst=roi, interpolation=cv2.INTER_LINEAR)
+        return prepared
+
+    def _compute_geometry(self, h, w):
+        scale = min(self.size / h, self.size / w)
+        new_w, new_h = int(round(w * scale)), int(round(h * scale))
+        if self.square:
+            out_w = out_h = self.size
+        else:
+            out_w = -(-new_w // self.stride) * self.stride
+            out_h = -(-new_h // self.stride) * self.stride
+        pad_x, pad_y = (out_w - new_w) // 2, (out_h - new_h) // 2
+        return scale, new_w, new_h, out_w, out_h, pad_x, pad_y
@@ -0,0 +1,121 @@
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class FrameRingStats:
+    frames: int
+    allocations: int      # times the capture had to allocate instead of decoding in place
+    allocated_mb: float
+    alloc_mb_per_s: float
+    starved: int          # frames dropped because every slot was leased
+    leased: int
+
+
+class FrameLease:
+    """
+    A frame borrowed from a FrameRing. The slot is not overwritten until
+    release() is called (or the with-block ends); release is idempotent.
+    .prepared is the model-sized copy made on the capture thread, if any.
+    """
+    __slots__ = ("frame", "frame_number", "prepared", "_ring", "_slot", "_released")
+
+    def __init__(self, ring, slot, frame, frame_number, prepared=None):
+        self.frame = frame
+        self.frame_number = frame_number
+        self.prepared = prepared
+        self._ring = ring
+        self._slot = slot
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._ring.release(self._slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class FrameRing:
+    """
+    Fixed set of frame buffers the capture thread decodes into.
+    The writer only ever picks a slot that is neither leased nor the latest
+    published frame, so readers never see a buffer change under them.
+    """
+
+    def __init__(self, size: int = 8):
+        if size < 3:
+            raise ValueError("FrameRing needs at least 3 slots (writing, latest, leased)")
+        self.size = size
+        self.buffers = [None] * size
+        self.prepared = [None] * size  # per-slot PreparedFrame, reused like the frame buffers
+        self._frame_numbers = [None] * size
+        self._refs = [0] * size
+        self._latest = None
+        self._next = 0
+        self._lock = threading.Lock()
+
+        self.frames = 0
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.starved = 0
+        self._started = time.perf_counter()
+
+    def acquire_write(self):
+        """Slot index to decode the next frame into, or None if every slot is busy."""
+        with self._lock:
+            for i in range(self.size):
+                slot = (self._next + i) % self.size
+                if self._refs[slot] == 0 and slot != self._latest:
+                    self._next = (slot + 1) % self.size
+                    return slot
+        self.starved += 1
+        return None
+
+    def note_allocation(self, frame):
+        self.allocations += 1
+        self.allocated_bytes += frame.nbytes
+
+    def commit(self, slot, frame, frame_number, prepared=None):
+        """Publish a decoded frame; frame is normally the slot's own buffer."""
+        if frame is not self.buffers[slot]:
+            self.note_allocation(frame)
+            self.buffers[slot] = frame
+        if prepared is not None and prepared is not self.prepared[slot]:
+            self.note_allocation(prepared.image)
+        with self._lock:
+            self.prepared[slot] = prepared
+            self._frame_numbers[slot] = frame_number
+            self._latest = slot
+        self.frames += 1
+
+    def lease_latest(self):
+        with self._lock:
+            slot = self._latest
+            if slot is None:
+                return None
+            self._refs[slot] += 1
+            return FrameLease(self, slot, self.buffers[slot], self._frame_numbers[slot], self.prepared[slot])
+
+    def release(self, slot):
+        with self._lock:
+            self._refs[slot] -= 1
+
+    def stats(self) -> FrameRingStats:
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        allocated_mb = self.allocated_bytes / (1024 * 1024)
+        with self._lock:
+            leased = sum(1 for r in self._refs if r > 0)
+        return FrameRingStats(
+            frames=self.frames,
+            allocations=self.allocations,
+            allocated_mb=allocated_mb,
+            alloc_mb_per_s=allocated_mb / elapsed,
+            starved=self.starved,
+            leased=leased
+        )
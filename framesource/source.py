@@ -9,16 +9,31 @@ class VideoFileSource(FrameSource):
     """
 
     def __init__(self, settings):
-        super().__init__()
+        super().__init__(ring_size=getattr(settings, "ring_size", 8))
         self.path = settings.video
         self.cap = cv2.VideoCapture(self.path)
+        # skipping more frames than this seeks instead of grabbing one by one
+        self.seek_threshold = getattr(settings, "seek_threshold", 15)
 
-    def _read_frame_blocking(self):
-        ok, frame = self.cap.read()
+    def _read_frame_blocking(self, out=None):
+        ok, frame = self.cap.read(image=out) if out is not None else self.cap.read()
         if not ok:
             return None
         return frame
 
+    def _grab(self) -> bool:
+        return self.cap.grab()
+
+    def _skip_frames(self, n: int) -> bool:
+        if n < self.seek_threshold:
+            return super()._skip_frames(n)
+
+        pos = self.cap.get(cv2.CAP_PROP_POS_FRAMES) + n
+        total = self.cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        if total > 0 and pos >= total:
+            return False
+        return self.cap.set(cv2.CAP_PROP_POS_FRAMES, pos)
+
     def release(self):
         if self.cap:
             self.cap.release()
@@ -31,7 +46,7 @@ class CameraSource(FrameSource):
     """
 
     def __init__(self, settings):
-        super().__init__()
+        super().__init__(ring_size=getattr(settings, "ring_size", 8))
         self.camera_index = settings.camera_index
 
         self.cap = cv2.VideoCapture(self.camera_index)
@@ -42,12 +57,15 @@ class CameraSource(FrameSource):
         if hasattr(settings, "fps") and settings.fps:
             self.cap.set(cv2.CAP_PROP_FPS, settings.fps)
 
-    def _read_frame_blocking(self):
-        ok, frame = self.cap.read()
+    def _read_frame_blocking(self, out=None):
+        ok, frame = self.cap.read(image=out) if out is not None else self.cap.read()
         if not ok:
             return None
         return frame
 
+    def _grab(self) -> bool:
+        return self.cap.grab()
+
     def release(self):
         if self.cap:
             self.cap.release()
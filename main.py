@@ -1,22 +1,21 @@
 import time
-import json
 import cv2
 import numpy as np
 
 from config.settings import AppSettings
-from datatypes.datatype import WorldPosition
 from framesource.source import VideoFileSource, CameraSource
 from framesource.FramePacer import FramePacer
-from detection.detector import PeopleDetector
-from tracking.tracker import ByteTrackerWrapper
-from transform.projection import Projector
-from transform.world_position_mapper import WorldPositionMapper
-from filters.smoothing import KalmanSmoother
-from streamdata.messaging import UDPSender
-import streamdata.jsonpack as jsonpack
+from framesource.preprocess import Letterboxer
+from detection.roi import ROI_OFF
+from streamdata.publisher import Publisher
+from streamdata.serializer import FrameSerializer
+from streamdata.jsonl_logger import JsonlLogger
 from viz.visualizer import draw_frame
 from viz.fps_tracker import FPSTracker
 from utils.keyboard_input import Keyboard
+from pipeline.executor import Pipeline, FramePacket, Batching
+from pipeline.multiprocess import MultiProcessTracker
+from pipeline.processing import FrameProcessor
 
 
 class LiveTracker:
@@ -24,14 +23,18 @@ class LiveTracker:
         self.settings = settings
 
         self.source = CameraSource(settings.video)
+        self.source.set_demand(
+            fps=settings.video.target_fps if settings.video.skip_decode else None,
+            stride=settings.video.capture_stride
+        )
+        if settings.video.letterbox_in_capture and settings.roi.mode == ROI_OFF:
+            self.source.set_preprocessor(Letterboxer(settings.yolo.imgsz))
         self.keyboard = Keyboard()
 
-        self.detector = PeopleDetector(settings.yolo)
-        self.tracker = ByteTrackerWrapper()
-        self.projector = Projector(settings.tracking)
-        self.smoother = KalmanSmoother()
-        self.mapper = WorldPositionMapper(self.projector, self.smoother)
-        self.sender = UDPSender(settings.network)
+        # detection, tracking and world mapping (shared with the multiprocess detect worker)
+        self.processor = FrameProcessor(settings)
+        self.serializer = FrameSerializer()
+        self.sender = Publisher(settings.network)
 
         self.pacer = FramePacer(settings.video.target_fps)
 
@@ -39,8 +42,16 @@ class LiveTracker:
 
         self.running = False
 
-        # optional JSONL logging
-        self.fout = open(settings.jsonl_path, "w") if getattr(settings, "save_jsonl", False) else None
+        # optional JSONL logging (background writer, rotating segments)
+        self.fout = None
+        if getattr(settings, "save_jsonl", False):
+            self.fout = JsonlLogger(
+                settings.jsonl_path,
+                max_bytes=settings.jsonl_max_bytes,
+                max_seconds=settings.jsonl_max_seconds,
+                compress=settings.jsonl_compress,
+                queue_size=settings.jsonl_queue_size
+            )
 
 
     def start(self):
@@ -76,67 +87,175 @@ class LiveTracker:
 
 
     def _run_loop(self):
+        if self.settings.pipeline.enabled:
+            self._run_pipelined()
+        else:
+            self._run_sequential()
+
+    def _should_stop(self) -> bool:
+        # If the source thread stopped (e.g. file EOF), exit loop
+        if not self.source.is_alive:
+            print("Source has died, stopping LiveTracker")
+            self.stop()
+            return True
+
+        if key := self.keyboard.read_key() == 27:
+            print("ESC pressed, stopping LiveTracker")
+            self.stop()
+            return True
+
+        return False
+
+    def _run_sequential(self):
+        last_frame_number = None
         try:
             self.fps_tracker.update()
             
             while self.running:
-                # If the source thread stopped (e.g. file EOF), exit loop
-                if not self.source.is_alive:
-                    print("Source has died, stopping LiveTracker")
-                    self.stop()
+                if self._should_stop():
                     break
 
-                if key := self.keyboard.read_key() == 27:
-                    print("ESC pressed, stopping LiveTracker")
-                    self.stop()
+                with self.pacer:
+                    # sleeps until the next slot, then blocks until there is a frame we have not processed yet
+                    lease = self.source.wait_next(last_frame_number, timeout=0.5)
+                    if lease is None:
+                        continue
+                    last_frame_number = lease.frame_number
+                    packet = FramePacket(lease.frame_number, time.time(), lease.frame, lease=lease)
+
+                    # the frame buffer stays ours until the lease is released
+                    with lease:
+                        self._detect_stage(packet)
+                        self._track_stage(packet)
+                        self._output_stage(packet)
+                        self._display(packet)
+        finally:
+            self.keyboard.restore()
+            self._cleanup()
+
+    def _run_pipelined(self):
+        """
+        Same stages as _run_sequential, but detection, tracking and output each run on
+        their own thread; the main thread only feeds frames and displays the results.
+        """
+        detect = ("detect", self._detect_stage)
+        if self.settings.pipeline.detect_batch_size > 1:
+            detect = ("detect", self._detect_batch_stage,
+                      Batching(self.settings.pipeline.detect_batch_size, self.settings.pipeline.detect_batch_wait))
+        pipeline = Pipeline(
+            [detect, ("track", self._track_stage), ("output", self._output_stage)],
+            queue_size=self.settings.pipeline.queue_size,
+            drop_policy=self.settings.pipeline.drop_policy,
+            on_drop=lambda packet: packet.lease.release()
+        )
+        pipeline.start()
+        last_frame_number = None
+        try:
+            self.fps_tracker.update()
+
+            while self.running:
+                if self._should_stop():
                     break
 
-                with self.pacer as should_process:
-                    if not should_process:
-                        continue # skip this frame
-                    
-                    frame, frame_number = self.source.read()
-                    loop_start = time.time()
-
-                    # 1) detection (YOLO)
-                    det, res = self.detector.detect(frame, filter_class = [settings.yolo.person_class_id])
-
-                    # 2) tracking (ByteTrack)
-                    tracks = self.tracker.update_with_detections(det)
-
-                    # 3) world positions (projection + smoothing)
-                    world_positions = self.mapper.map_tracks(tracks, loop_start)
-
-                    # 4) JSON payloads
-                    packet = jsonpack.format_live_packet(world_positions, time.strftime("%H:%M:%S"))
-                    packet_for_receiver = jsonpack.format_for_receiver(packet)
-
-                    # 5) send via UDP
-                    try:
-                        self.sender.send(packet_for_receiver)
-                    except Exception as e:
-                        # do not crash the loop on transient network errors
-                        print(f"[WARN] UDP send failed: {e}")
-
-                    # 6) optional logging
-                    if self.fout:
-                        try:
-                            self.fout.write(json.dumps(packet) + "\n")
-                        except Exception:
-                            pass
-
-                    if self.settings.visualizer.show_window:
-                        vis = draw_frame(frame, tracks, self.settings.visualizer, fps_tracker=self.fps_tracker)
-                        cv2.imshow("Live Position Tracker (Press ESC on the commandline to quit)", vis)
-
-                    self.fps_tracker.update()
+                with self.pacer:
+                    lease = self.source.wait_next(last_frame_number, timeout=0.5)
+                    if lease is not None:
+                        last_frame_number = lease.frame_number
+                        pipeline.submit(FramePacket(lease.frame_number, time.time(), lease.frame, lease=lease))
+
+                # display whatever finished since the last iteration (cv2 windows stay on the main thread)
+                while (packet := pipeline.get(timeout=0)) is not None:
+                    with packet.lease:
+                        self._display(packet)
         finally:
+            pipeline.stop()
             self.keyboard.restore()
             self._cleanup()
 
+    #
+    # Stages; each takes a FramePacket and stores its results in packet.data
+    #
+    def _detect_stage(self, packet: FramePacket) -> FramePacket:
+        # 1) detection (YOLO), unless nothing moves or the tracks are propagated on this frame
+        start = time.perf_counter()
+        if not self._should_detect(packet):
+            packet.data["detections"] = None
+            packet.data["busy"] = time.perf_counter() - start
+            return packet
+        prepared = packet.lease.prepared if packet.lease is not None else None
+        packet.data["detections"] = self.processor.detect(packet.frame, prepared=prepared)
+        packet.data["busy"] = time.perf_counter() - start
+        self.processor.note_detection(packet.data["busy"])
+        return packet
+
+    def _detect_batch_stage(self, packets):
+        # 1) detection (YOLO), one batched predict for several frames
+        start = time.perf_counter()
+        for packet in packets:
+            packet.data["detections"] = None
+        packets_to_detect = [packet for packet in packets if self._should_detect(packet)]
+        if not packets_to_detect:
+            for packet in packets:
+                packet.data["busy"] = (time.perf_counter() - start) / len(packets)
+            return packets
+        prepared = [packet.lease.prepared if packet.lease is not None else None for packet in packets_to_detect]
+        dets = self.processor.detect_batch([packet.frame for packet in packets_to_detect], prepared=prepared)
+        for packet, det in zip(packets_to_detect, dets):
+            packet.data["detections"] = det
+        elapsed = time.perf_counter() - start
+        for packet in packets:
+            packet.data["busy"] = elapsed / len(packets)
+        for _ in packets_to_detect:
+            self.processor.note_detection(elapsed / len(packets_to_detect))
+        return packets
+
+    def _should_detect(self, packet: FramePacket) -> bool:
+        return self.processor.should_detect(packet.frame, packet.frame_number)
+
+    def _track_stage(self, packet: FramePacket) -> FramePacket:
+        # 2) tracking (ByteTrack) and 3) world positions (projection + smoothing)
+        start = time.perf_counter()
+        packet.data["world_positions"] = self.processor.track(
+            packet.frame, packet.frame_number, packet.data["detections"], packet.timestamp
+        )
+        packet.data["busy"] += time.perf_counter() - start
+        return packet
+
+    def _output_stage(self, packet: FramePacket) -> FramePacket:
+        start = time.perf_counter()
+        world_positions = packet.data["world_positions"]
+
+        # 4) JSON payloads (receiver payload + log line in one pass)
+        payload, log_line = self.serializer.encode(world_positions, time.strftime("%H:%M:%S"))
+
+        # 5) send via UDP
+        try:
+            self.sender.send_frame(world_positions, packet.timestamp, payload)
+        except Exception as e:
+            # do not crash the loop on transient network errors
+            print(f"[WARN] UDP send failed: {e}")
+
+        # 6) optional logging (queued, dropped if the writer falls behind)
+        if self.fout:
+            self.fout.write(log_line)
+
+        # 7) per-frame processing time (all stages, without queueing) for the resolution controller
+        packet.data["busy"] += time.perf_counter() - start
+        self.processor.observe(packet.frame_number, packet.data["busy"])
+        return packet
+
+    def _display(self, packet: FramePacket):
+        if self.settings.visualizer.show_window:
+            vis = draw_frame(packet.frame, packet.data["world_positions"], self.settings.visualizer, fps_tracker=self.fps_tracker)
+            cv2.imshow("Live Position Tracker (Press ESC on the commandline to quit)", vis)
+
+        self.fps_tracker.update()
+
 
     def _cleanup(self):
         print("[INFO] Shutting down.")
+        self.processor.log_stats()
+        self.sender.log_stats()
         try:
             self.source.stop()
         except Exception:
@@ -171,5 +290,8 @@ class LiveTracker:
 if __name__ == "__main__":
     settings = AppSettings()
     # inject VideoFileSource(settings.video) or CameraSource(settings.video)
-    tracker = LiveTracker(settings)
+    if settings.pipeline.multiprocess:
+        tracker = MultiProcessTracker(settings)
+    else:
+        tracker = LiveTracker(settings)
     tracker.start()
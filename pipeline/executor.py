@@ -0,0 +1,268 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# What a full queue does with a new item
+DROP_BLOCK = "block"          # wait for room (backpressure all the way to the producer)
+DROP_OLDEST = "drop_oldest"   # discard the oldest queued item
+KEEP_LATEST = "latest"        # discard everything queued, keep only the new item
+DROP_POLICIES = (DROP_BLOCK, DROP_OLDEST, KEEP_LATEST)
+
+
+@dataclass
+class FramePacket:
+    """One frame travelling through the pipeline; stages add their results to .data."""
+    frame_number: int
+    timestamp: float
+    frame: Any = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    lease: Any = None  # FrameLease backing .frame, released once the packet is done
+
+
+@dataclass
+class Batching:
+    """Let a stage take up to `size` packets per call, waiting at most `max_wait` seconds after the first."""
+    size: int
+    max_wait: float = 0.03
+
+
+class StageQueue:
+    """Bounded FIFO between two stages with a configurable drop policy."""
+
+    def __init__(self, maxsize: int = 2, drop_policy: str = KEEP_LATEST,
+                 on_drop: Optional[Callable[[Any], None]] = None):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}', expected one of {DROP_POLICIES}")
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+        self.on_drop = on_drop
+
+    def put(self, item, timeout: Optional[float] = None) -> bool:
+        """Returns False if the item (or the queue) was closed / timed out instead of queued."""
+        discarded = []
+        with self._cond:
+            queued = True
+            if self.drop_policy == DROP_BLOCK:
+                queued = self._cond.wait_for(lambda: self._closed or len(self._items) < self.maxsize, timeout)
+            elif self.drop_policy == KEEP_LATEST:
+                discarded.extend(self._items)
+                self._items.clear()
+            elif len(self._items) >= self.maxsize:
+                discarded.append(self._items.popleft())
+
+            if self._closed:
+                queued = False
+            if queued:
+                self._items.append(item)
+                self._cond.notify_all()
+            else:
+                discarded.append(item)
+            self.dropped += len(discarded)
+
+        for dropped in discarded:
+            self.drop(dropped)
+        return queued
+
+    def drop(self, item):
+        """Hand an item that will not be processed any further to on_drop (e.g. to free its frame)."""
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    def get(self, timeout: Optional[float] = None):
+        """Returns the next item, or None on timeout / when closed and empty."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._closed or self._items, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def get_batch(self, size: int, max_wait: float, timeout: Optional[float] = None) -> list:
+        """
+        Waits (up to timeout) for one item, then keeps collecting until there are `size`
+        items or max_wait seconds have passed since the first one. Returns [] on timeout / when closed and empty.
+        """
+        first = self.get(timeout)
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + max_wait
+        with self._cond:
+            while len(batch) < size:
+                if not self._items:
+                    remaining = deadline - time.perf_counter()
+                    if self._closed or remaining <= 0 or not self._cond.wait_for(lambda: self._closed or self._items, remaining):
+                        break
+                    if not self._items:
+                        break
+                batch.append(self._items.popleft())
+            self._cond.notify_all()
+        return batch
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+@dataclass
+class StageStats:
+    name: str
+    processed: int
+    errors: int
+    dropped: int      # dropped on this stage's input queue
+    avg_ms: float
+
+
+class Stage:
+    """
+    Runs fn(packet) on its own worker thread, reading from in_queue and writing to out_queue.
+    With batching, fn takes a list of packets and returns a list of the same length instead.
+    """
+
+    def __init__(self, name: str, fn: Callable, in_queue: StageQueue, out_queue: StageQueue,
+                 batching: Optional[Batching] = None):
+        self.name = name
+        self.fn = fn
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.batching = batching
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self._last_frame_number = None
+        self._thread = threading.Thread(target=self._worker, name=f"stage-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def _worker(self):
+        while True:
+            if self.batching is None:
+                packet = self.in_queue.get()
+                packets = [packet] if packet is not None else []
+            else:
+                packets = self.in_queue.get_batch(self.batching.size, self.batching.max_wait)
+            if not packets:
+                # queue closed: propagate shutdown downstream
+                self.out_queue.close()
+                return
+
+            packets = [packet for packet in packets if self._in_order(packet)]
+            if not packets:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = self.fn(packets) if self.batching is not None else [self.fn(packets[0])]
+            except Exception as e:
+                self.errors += 1
+                print(f"[ERROR] Pipeline stage '{self.name}' failed on frame {packets[-1].frame_number}: {e}")
+                for packet in packets:
+                    self.in_queue.drop(packet)
+                continue
+            finally:
+                self.busy_time += time.perf_counter() - start
+            self.processed += len(packets)
+
+            for packet, result in zip(packets, results):
+                if result is not None:
+                    self.out_queue.put(result)
+                else:
+                    self.in_queue.drop(packet)
+
+    def _in_order(self, packet: FramePacket) -> bool:
+        # drops never reorder, but guard anyway so no stage sees a frame twice or out of order
+        if self._last_frame_number is not None and packet.frame_number <= self._last_frame_number:
+            self.in_queue.drop(packet)
+            return False
+        self._last_frame_number = packet.frame_number
+        return True
+
+    def stats(self) -> StageStats:
+        return StageStats(
+            name=self.name,
+            processed=self.processed,
+            errors=self.errors,
+            dropped=self.in_queue.dropped,
+            avg_ms=1000.0 * self.busy_time / self.processed if self.processed else 0.0
+        )
+
+
+class Pipeline:
+    """
+    Chain of stages, each on its own thread with a bounded queue in front of it,
+    so throughput is set by the slowest stage rather than the sum of all stages.
+
+    Usage:
+        pipeline = Pipeline([("detect", detect_fn), ("track", track_fn)], queue_size=2, drop_policy="latest")
+        pipeline.start()
+        pipeline.submit(FramePacket(frame_number, timestamp, frame))
+        done = pipeline.get(timeout=0)   # packets that passed every stage, in frame order
+        pipeline.stop()
+
+    on_drop(packet) is called for every packet that is dropped, fails, or is still
+    queued at shutdown, so resources attached to it (like a leased frame) can be freed.
+
+    A stage given as (name, fn, Batching(size, max_wait)) receives lists of packets.
+    The queues before and after it hold at least `size` packets and, since keeping
+    only the latest would never let a batch fill (or would throw most of its
+    results away), drop the oldest instead.
+    """
+
+    def __init__(self, stages: List[Tuple], queue_size: int = 2, drop_policy: str = KEEP_LATEST,
+                 on_drop: Optional[Callable[[FramePacket], None]] = None):
+        batchings = [stage[2] if len(stage) > 2 else None for stage in stages]
+        queues = []
+        for i in range(len(stages) + 1):
+            size, policy = queue_size, drop_policy
+            if i == len(stages):
+                # results are consumed by the caller (e.g. display on the main thread); a slow
+                # consumer loses the oldest results instead of stalling the last stage
+                policy = DROP_OLDEST
+            for batching in (batchings[i] if i < len(stages) else None, batchings[i - 1] if i > 0 else None):
+                if batching is not None:
+                    size = max(size, batching.size)
+                    policy = DROP_OLDEST if policy == KEEP_LATEST else policy
+            queues.append(StageQueue(size, policy, on_drop))
+        self.queues = queues
+        self.input = queues[0]
+        self.output = queues[-1]
+        self.stages = [Stage(stage[0], stage[1], queues[i], queues[i + 1], batchings[i])
+                       for i, stage in enumerate(stages)]
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def submit(self, packet: FramePacket, timeout: Optional[float] = None) -> bool:
+        return self.input.put(packet, timeout)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[FramePacket]:
+        return self.output.get(timeout)
+
+    def stop(self, timeout: float = 2.0):
+        """Close the input; every stage finishes its current packet and shuts down in order."""
+        self.input.close()
+        for stage in self.stages:
+            stage.join(timeout)
+        for queue in self.queues:
+            while (packet := queue.get(timeout=0)) is not None:
+                queue.drop(packet)
+
+    def stats(self) -> List[StageStats]:
+        return [stage.stats() for stage in self.stages]
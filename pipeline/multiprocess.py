@@ -0,0 +1,270 @@
+import multiprocessing as mp
+import queue
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import cv2
+
+from config.settings import AppSettings
+from framesource.source import CameraSource
+from framesource.FramePacer import FramePacer
+from streamdata.publisher import Publisher
+from streamdata.serializer import FrameSerializer
+from streamdata.jsonl_logger import JsonlLogger
+from viz.visualizer import draw_frame
+from viz.fps_tracker import FPSTracker
+from utils.keyboard_input import Keyboard
+from pipeline.processing import FrameProcessor
+from pipeline.shared_ring import SharedFrameRing
+
+
+@dataclass
+class FrameDescriptor:
+    """What travels between the processes: a ring slot plus the small per-frame results."""
+    slot: int
+    frame_number: int
+    timestamp: float
+    world_positions: Any = None
+
+
+class MultiProcessTracker:
+    """
+    LiveTracker split over three processes so the Python-heavy stages do not share one GIL:
+
+        capture  -> decodes camera frames straight into SharedFrameRing slots
+        detect   -> detection, tracking, projection and smoothing
+        output   -> JSON encoding, UDP, JSONL logging and the preview window
+
+    Frames stay in shared memory; the queues only carry FrameDescriptors and
+    keep just the newest one when the next process falls behind. The main
+    process watches the keyboard and the workers: ESC, or any process exiting,
+    stops all of them and frees the shared memory.
+    """
+
+    def __init__(self, settings: AppSettings):
+        self.settings = settings
+        self.running = False
+
+    def start(self):
+        if self.running:
+            print("[WARN] MultiProcessTracker.start() called while already running.")
+            return
+
+        print("Starting Tracker (multiprocess)!")
+        print("Press ESC to quit...")
+        print(f"[DEBUG] Sending data to UDP {self.settings.network.host}:{self.settings.network.port}")
+        video = self.settings.video
+        # the capture process decodes every frame into the ring itself, without CameraSource's demand/preprocessing
+        for name, enabled in (("skip_decode", video.skip_decode), ("capture_stride", video.capture_stride > 1),
+                              ("letterbox_in_capture", video.letterbox_in_capture)):
+            if enabled:
+                print(f"[WARN] VideoSettings.{name} is not supported in multiprocess mode and is ignored.")
+
+        # spawn everywhere: forking a process that already initialised CUDA/torch is unsafe
+        ctx = mp.get_context("spawn")
+        queue_size = self.settings.pipeline.queue_size
+        # one slot being written, one in each process and up to queue_size in each queue
+        slots = max(video.ring_size, 2 * queue_size + 3)
+        ring = SharedFrameRing.create(ctx, (video.height, video.width, 3), slots)
+
+        stop = ctx.Event()
+        frame_queue = ctx.Queue(queue_size)
+        result_queue = ctx.Queue(queue_size)
+        processes = [
+            ctx.Process(target=_capture_worker, name="capture", daemon=True,
+                        args=(self.settings, ring.spec, ring.states, frame_queue, stop)),
+            ctx.Process(target=_detect_worker, name="detect", daemon=True,
+                        args=(self.settings, ring.spec, ring.states, frame_queue, result_queue, stop)),
+            ctx.Process(target=_output_worker, name="output", daemon=True,
+                        args=(self.settings, ring.spec, ring.states, result_queue, stop)),
+        ]
+        for p in processes:
+            p.start()
+
+        self.running = True
+        keyboard = Keyboard()
+        try:
+            while self.running:
+                if keyboard.read_key() == 27:
+                    print("ESC pressed, stopping MultiProcessTracker")
+                    break
+                dead = [p for p in processes if not p.is_alive()]
+                if dead:
+                    print(f"Process '{dead[0].name}' exited (code {dead[0].exitcode}), stopping MultiProcessTracker")
+                    break
+                stop.wait(0.05)
+        finally:
+            self.running = False
+            keyboard.restore()
+            self._shutdown(processes, stop, ring)
+
+    def stop(self):
+        self.running = False
+
+    @staticmethod
+    def _shutdown(processes, stop, ring):
+        print("[INFO] Shutting down.")
+        stop.set()
+        for p in processes:
+            p.join(timeout=3)
+        for p in processes:
+            if p.is_alive():
+                print(f"[WARN] Process '{p.name}' did not stop in time, terminating it")
+                p.terminate()
+                p.join(timeout=1)
+        ring.close()
+        ring.unlink()
+
+
+#
+# Worker processes (module level so they can be spawned)
+#
+def _put_latest(q, descriptor: FrameDescriptor, ring: SharedFrameRing):
+    """Replace whatever is still queued by descriptor, releasing the slots of the replaced frames."""
+    while True:
+        try:
+            ring.release(q.get_nowait().slot)
+        except queue.Empty:
+            break
+    try:
+        q.put_nowait(descriptor)
+    except queue.Full:
+        ring.release(descriptor.slot)
+
+
+def _capture_worker(settings: AppSettings, spec, states, frame_queue, stop):
+    ring = SharedFrameRing.attach(spec, states)
+    source = None
+    try:
+        source = CameraSource(settings.video)
+        scratch = None  # decode target when every slot is in use
+        warned_shape = False
+        while not stop.is_set():
+            slot = ring.acquire()
+            out = ring.frames[slot] if slot is not None else scratch
+            frame = source.read_blocking(out)
+            if frame is None:
+                if slot is not None:
+                    ring.release(slot)
+                print("Source has died, stopping capture process")
+                break
+
+            if slot is None:
+                # consumers hold every slot: keep the camera drained but drop this frame
+                scratch = frame
+                continue
+            if frame is not out:
+                # the camera ignored the requested size; fit it into the slot
+                if not warned_shape:
+                    print(f"[WARN] Camera delivers {frame.shape}, resizing into shared slots of {spec.shape}")
+                    warned_shape = True
+                cv2.resize(frame, (spec.shape[1], spec.shape[0]), dst=ring.frames[slot])
+
+            _put_latest(frame_queue, FrameDescriptor(slot, source.frame_number, time.time()), ring)
+    except Exception as e:
+        print(f"[ERROR] Capture process failed: {e}")
+    finally:
+        stop.set()
+        frame_queue.cancel_join_thread()
+        if source is not None:
+            source.release()
+        ring.close()
+
+
+def _detect_worker(settings: AppSettings, spec, states, frame_queue, result_queue, stop):
+    ring = SharedFrameRing.attach(spec, states)
+    processor = None
+    try:
+        # same detection/tracking/mapping as LiveTracker; the resolution controller's budget
+        # covers this process's work per frame (detect + track + map), output runs in parallel
+        processor = FrameProcessor(settings)
+        pacer = FramePacer(settings.video.target_fps)
+
+        while not stop.is_set():
+            with pacer:
+                try:
+                    descriptor = frame_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+                try:
+                    start = time.perf_counter()
+                    frame = ring.frames[descriptor.slot]
+                    detections = None
+                    if processor.should_detect(frame, descriptor.frame_number):
+                        detections = processor.detect(frame)
+                        processor.note_detection(time.perf_counter() - start)
+                    descriptor.world_positions = processor.track(frame, descriptor.frame_number, detections,
+                                                                 descriptor.timestamp)
+                    processor.observe(descriptor.frame_number, time.perf_counter() - start)
+                except Exception:
+                    ring.release(descriptor.slot)
+                    raise
+                _put_latest(result_queue, descriptor, ring)
+    except Exception as e:
+        print(f"[ERROR] Detection process failed: {e}")
+    finally:
+        stop.set()
+        if processor is not None:
+            processor.log_stats()
+        result_queue.cancel_join_thread()
+        ring.close()
+
+
+def _output_worker(settings: AppSettings, spec, states, result_queue, stop):
+    ring = SharedFrameRing.attach(spec, states)
+    sender = None
+    fout = None
+    try:
+        serializer = FrameSerializer()
+        sender = Publisher(settings.network)
+        if getattr(settings, "save_jsonl", False):
+            fout = JsonlLogger(
+                settings.jsonl_path,
+                max_bytes=settings.jsonl_max_bytes,
+                max_seconds=settings.jsonl_max_seconds,
+                compress=settings.jsonl_compress,
+                queue_size=settings.jsonl_queue_size
+            )
+        fps_tracker = FPSTracker()
+        fps_tracker.update()
+
+        while not stop.is_set():
+            try:
+                descriptor = result_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                world_positions = descriptor.world_positions
+                payload, log_line = serializer.encode(world_positions, time.strftime("%H:%M:%S"))
+                try:
+                    sender.send_frame(world_positions, descriptor.timestamp, payload)
+                except Exception as e:
+                    print(f"[WARN] UDP send failed: {e}")
+                if fout:
+                    fout.write(log_line)
+
+                if settings.visualizer.show_window:
+                    vis = draw_frame(ring.frames[descriptor.slot], world_positions, settings.visualizer, fps_tracker=fps_tracker)
+                    cv2.imshow("Live Position Tracker (Press ESC on the commandline to quit)", vis)
+                    # this process owns the window, so it has to pump its events
+                    cv2.waitKey(1)
+                fps_tracker.update()
+            finally:
+                ring.release(descriptor.slot)
+    except Exception as e:
+        print(f"[ERROR] Output process failed: {e}")
+    finally:
+        stop.set()
+        if fout:
+            fout.close()
+        if sender is not None:
+            sender.log_stats()
+            sender.close()
+        try:
+            cv2.destroyAllWindows()
+        except Exception:
+            pass
+        ring.close()
@@ -0,0 +1,128 @@
+import numpy as np
+import supervision as sv
+
+from config.settings import AppSettings
+from detection.detector import PeopleDetector
+from detection.roi import RoiDetector, ROI_OFF
+from detection.motion_gate import MotionGate
+from detection.resolution import ResolutionController
+from tracking.tracker import create_tracker, lost_track_frames, TRACKER_NUMPY
+from tracking.propagation import TrackPropagator
+from transform.projection import Projector
+from transform.world_position_mapper import WorldPositionMapper
+from filters.smoothing import KalmanSmoother
+
+
+class FrameProcessor:
+    """
+    Detection, tracking and world mapping of one camera; the part of the loop
+    LiveTracker and the multiprocess detect worker have in common.
+
+    Builds the detector (optionally behind the floor ROI), the resolution
+    controller, motion gate, track propagator, tracker and the projection +
+    smoothing from AppSettings, and runs them per frame:
+
+        should_detect(frame, n)   motion gate, resolution stride, propagation schedule
+        detect(frame) / detect_batch(frames)
+        track(frame, n, detections, timestamp) -> world positions
+        observe(n, seconds)       frame time for the resolution controller
+
+    With tracker = "numpy" detections are raw (N, 6) rows end to end, otherwise
+    sv.Detections for ByteTrackerWrapper.
+    """
+
+    def __init__(self, settings: AppSettings):
+        self.settings = settings
+        self.filter_class = [settings.yolo.person_class_id]
+
+        self.detector = PeopleDetector(settings.yolo)
+        # optional: trade imgsz (then detection rate) for frame time when over budget
+        self.resolution = None
+        if settings.resolution.enabled:
+            self.resolution = ResolutionController(settings.resolution, self.detector, settings.video.target_fps)
+        if settings.roi.mode != ROI_OFF:
+            # detect on the floor region only (so no full-frame letterboxing in the capture thread)
+            self.detector = RoiDetector(self.detector, settings.roi, settings.tracking)
+        self.tracker = create_tracker(settings.tracking, frame_rate=settings.video.target_fps)
+        # the numpy tracker takes the model's (N, 6) rows directly, bytetrack needs sv.Detections
+        self.raw = settings.tracking.tracker == TRACKER_NUMPY
+        # optional: detect every Nth frame only, propagating the tracks in between
+        self.propagator = None
+        if settings.schedule.interval > 1 or settings.schedule.adaptive or self.resolution is not None:
+            self.propagator = TrackPropagator(settings.schedule, raw=self.raw)
+        # optional: no detection while the floor is static
+        self.motion_gate = None
+        if settings.motion_gate.enabled:
+            self.motion_gate = MotionGate(settings.motion_gate, settings.roi, settings.tracking)
+        self._last_detections = None
+
+        self.projector = Projector(settings.tracking)
+        # smoother state lives as long as the tracker keeps the id, unless track_ttl (seconds) overrides it
+        track_ttl = settings.tracking.track_ttl
+        self.smoother = KalmanSmoother(
+            capacity=settings.tracking.track_pool_size,
+            ttl=track_ttl,
+            ttl_frames=lost_track_frames(settings.tracking, settings.video.target_fps) if track_ttl is None else None
+        )
+        self.mapper = WorldPositionMapper(self.projector, self.smoother)
+
+    def should_detect(self, frame, frame_number: int) -> bool:
+        if self.motion_gate is not None and not self.motion_gate.check(frame):
+            return False
+        if self.resolution is not None and not self.resolution.should_detect(frame_number):
+            return False
+        if self.propagator is not None and not self.propagator.should_detect(frame_number):
+            return False
+        return True
+
+    def detect(self, frame, prepared=None):
+        detect = self.detector.detect_raw if self.raw else self.detector.detect
+        detections, _ = detect(frame, filter_class=self.filter_class, prepared=prepared)
+        return detections
+
+    def detect_batch(self, frames, prepared=None):
+        detect_batch = self.detector.detect_batch_raw if self.raw else self.detector.detect_batch
+        return detect_batch(frames, filter_class=self.filter_class, prepared=prepared)
+
+    def note_detection(self, seconds: float):
+        """Detector time of one frame, for the motion gate's CPU estimate."""
+        if self.motion_gate is not None:
+            self.motion_gate.note_detection(seconds)
+
+    def track(self, frame, frame_number: int, detections, timestamp: float) -> np.ndarray:
+        """
+        detections is None on frames that skipped the detector: those get the previous
+        tracks moved along, or (motion gate, static scene) the previous detections again
+        so the tracks stay alive.
+        """
+        detected = detections is not None
+        if not detected:
+            if self.propagator is not None:
+                detections = self.propagator.propagate(frame, frame_number)
+            elif self._last_detections is not None:
+                detections = self._last_detections
+            else:
+                detections = np.empty((0, 6), dtype=np.float32) if self.raw else sv.Detections.empty()
+        else:
+            self._last_detections = detections
+        if self.raw:
+            tracks = self.tracker.update(detections)
+        else:
+            tracks = self.tracker.update_with_detections(detections)
+        if self.propagator is not None:
+            self.propagator.observe(frame, frame_number, tracks, detected=detected)
+        return self.mapper.map_tracks(tracks, timestamp)
+
+    def observe(self, frame_number: int, frame_seconds: float):
+        """Per-frame processing time for the resolution controller."""
+        if self.resolution is not None:
+            self.resolution.observe(frame_number, frame_seconds)
+
+    def log_stats(self):
+        if self.motion_gate is not None:
+            stats = self.motion_gate.stats()
+            print(f"[INFO] Motion gate skipped {100 * stats.skipped_fraction:.0f}% of {stats.frames} frames, "
+                  f"saving ~{stats.cpu_saved_s:.1f}s of detection (gate {stats.gate_ms:.2f} ms/frame)")
+        if self.resolution is not None:
+            print(f"[INFO] Resolution controller made {len(self.resolution.changes)} changes, "
+                  f"ended at imgsz {self.resolution.imgsz}, detection stride {self.resolution.stride}")
@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+SLOT_FREE = 0
+SLOT_IN_USE = 1
+
+
+@dataclass
+class SharedRingSpec:
+    """Everything another process needs to attach to a SharedFrameRing (picklable)."""
+    name: str
+    shape: Tuple[int, ...]  # shape of one frame, e.g. (1080, 1920, 3)
+    dtype: str
+    slots: int
+
+
+class SharedFrameRing:
+    """
+    Fixed frame slots in one multiprocessing.shared_memory block, shared by
+    several processes. `frames[slot]` is a numpy view straight onto the shared
+    memory, so processes only exchange slot numbers, never pixels.
+
+    Ownership is tracked in `states`, a multiprocessing.Array with one entry per
+    slot: the writer acquire()s a free slot, fills it and hands its number on;
+    whichever process is last to use the frame release()s it.
+    """
+
+    def __init__(self, spec: SharedRingSpec, states, create: bool = False):
+        self.spec = spec
+        self.states = states
+        frame_bytes = int(np.prod(spec.shape)) * np.dtype(spec.dtype).itemsize
+        self.shm = shared_memory.SharedMemory(name=None if create else spec.name, create=create,
+                                              size=frame_bytes * spec.slots if create else 0)
+        if create:
+            spec.name = self.shm.name
+        self.frames = np.ndarray((spec.slots,) + tuple(spec.shape), dtype=spec.dtype, buffer=self.shm.buf)
+        self._next = 0
+
+    @classmethod
+    def create(cls, ctx, shape, slots: int = 8, dtype=np.uint8) -> "SharedFrameRing":
+        """Allocate a new ring; ctx is the multiprocessing context the worker processes are started from."""
+        spec = SharedRingSpec(name="", shape=tuple(shape), dtype=np.dtype(dtype).str, slots=slots)
+        return cls(spec, ctx.Array("b", slots), create=True)
+
+    @classmethod
+    def attach(cls, spec: SharedRingSpec, states) -> "SharedFrameRing":
+        return cls(spec, states, create=False)
+
+    def acquire(self):
+        """Claim a free slot for writing, or None if every slot is in use."""
+        with self.states.get_lock():
+            for i in range(self.spec.slots):
+                slot = (self._next + i) % self.spec.slots
+                if self.states[slot] == SLOT_FREE:
+                    self.states[slot] = SLOT_IN_USE
+                    self._next = (slot + 1) % self.spec.slots
+                    return slot
+        return None
+
+    def release(self, slot: int):
+        with self.states.get_lock():
+            self.states[slot] = SLOT_FREE
+
+    def in_use(self) -> int:
+        with self.states.get_lock():
+            return sum(1 for s in self.states if s != SLOT_FREE)
+
+    def close(self):
+        # drop the numpy view first, the buffer cannot be closed while it is exported
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # a frame view is still referenced in this process; the mapping goes when it does
+            pass
+
+    def unlink(self):
+        """Free the shared memory; only the creating process should call this (after close())."""
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
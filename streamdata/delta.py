@@ -0,0 +1,252 @@
+import struct
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# ----------------------------------------------------
+# Delta wire format (all little-endian)
+#   header : magic "MKOD" | version u8 | kind u8 | seq u32 | capture timestamp f64
+#            | n_full u16 | n_update u16 | n_remove u16
+#   full   : id u32 | x i32 | y i32 | r u16      (absolute, quantized)
+#   update : id u32 | dx i16 | dy i16 | dr i16   (relative to the last state sent)
+#   remove : id u32
+# A keyframe carries only full records and replaces the receiver state.
+# A delta frame carries full records for new ids ("add"), updates, and removes;
+# ids that did not change are left out entirely.
+# ----------------------------------------------------
+DELTA_MAGIC = b"MKOD"
+DELTA_VERSION = 1
+KIND_KEYFRAME = 0
+KIND_DELTA = 1
+
+DELTA_HEADER = struct.Struct("<4sBBIdHHH")
+FULL_RECORD = struct.Struct("<IiiH")
+UPDATE_RECORD = struct.Struct("<Ihhh")
+REMOVE_RECORD = struct.Struct("<I")
+
+FULL_DTYPE = np.dtype([("id", "<u4"), ("x", "<i4"), ("y", "<i4"), ("r", "<u2")])
+UPDATE_DTYPE = np.dtype([("id", "<u4"), ("dx", "<i2"), ("dy", "<i2"), ("dr", "<i2")])
+
+POS_RESOLUTION = 0.001  # metres per step (same precision as the JSON payload)
+DIR_RESOLUTION = 0.1    # degrees per step
+DIR_STEPS = 3600
+MAX_STEP = 32767
+
+
+def _quantize(frame_result: np.ndarray) -> np.ndarray:
+    q = np.empty((len(frame_result), 3), dtype=np.int64)
+    q[:, 0] = np.round(frame_result["x"] / POS_RESOLUTION)
+    q[:, 1] = np.round(frame_result["y"] / POS_RESOLUTION)
+    q[:, 2] = np.round((frame_result["dir"] % 360.0) / DIR_RESOLUTION).astype(np.int64) % DIR_STEPS
+    return q
+
+
+@dataclass
+class DeltaStats:
+    frames: int
+    keyframes: int
+    bytes_sent: int
+    bytes_saved: int
+    bytes_saved_per_second: float  # over the last second
+    seconds: float                 # since the first encoded frame
+
+
+class DeltaEncoder:
+    """
+    Delta/keyframe encoder for one consumer.
+
+    Keeps the quantized state the consumer should hold and only sends what
+    changed, with a full keyframe every keyframe_interval frames (or sooner
+    after request_keyframe(), e.g. when a receiver reports loss).
+    """
+
+    def __init__(self, keyframe_interval: int = 30):
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+
+        # receiver-side state, sorted by id
+        self._ids = np.empty(0, dtype=np.int64)
+        self._q = np.empty((0, 3), dtype=np.int64)
+        self._since_keyframe = 0
+        self._force_keyframe = True
+
+        self.frames = 0
+        self.keyframes = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+        self._saved_window = deque()  # (time, bytes saved) over the last second
+        self._started = None
+
+    def request_keyframe(self):
+        self._force_keyframe = True
+
+    def encode(self, frame_result: np.ndarray, timestamp: float) -> bytes:
+        order = np.argsort(frame_result["id"], kind="stable")
+        ids = frame_result["id"][order].astype(np.int64)
+        q = _quantize(frame_result[order])
+
+        keyframe = self._force_keyframe or self._since_keyframe >= self.keyframe_interval
+        if keyframe:
+            payload = self._pack(KIND_KEYFRAME, timestamp, ids, q)
+            self._force_keyframe = False
+            self._since_keyframe = 0
+            self.keyframes += 1
+        else:
+            payload = self._pack_delta(timestamp, ids, q)
+        self._since_keyframe += 1
+
+        self._ids = ids
+        self._q = q
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+
+        # what the same frame would have cost as a keyframe
+        full_size = DELTA_HEADER.size + len(ids) * FULL_RECORD.size
+        self._record(len(payload), full_size - len(payload))
+        return payload
+
+    def _pack(self, kind, timestamp, ids, q, updates=None, removes=None):
+        full = np.empty(len(ids), dtype=FULL_DTYPE)
+        full["id"] = ids
+        full["x"] = q[:, 0]
+        full["y"] = q[:, 1]
+        full["r"] = q[:, 2]
+        if updates is None:
+            updates = np.empty(0, dtype=UPDATE_DTYPE)
+        if removes is None:
+            removes = np.empty(0, dtype=np.int64)
+
+        header = DELTA_HEADER.pack(DELTA_MAGIC, DELTA_VERSION, kind, self.seq, timestamp,
+                                   len(full), len(updates), len(removes))
+        return header + full.tobytes() + updates.tobytes() + removes.astype("<u4").tobytes()
+
+    def _pack_delta(self, timestamp, ids, q):
+        prev_ids = self._ids
+        idx = np.searchsorted(prev_ids, ids)
+        idx_clipped = np.minimum(idx, max(len(prev_ids) - 1, 0))
+        found = (idx < len(prev_ids)) & (prev_ids[idx_clipped] == ids) if len(prev_ids) else np.zeros(len(ids), dtype=bool)
+
+        d = np.zeros_like(q)
+        d[found] = q[found] - self._q[idx_clipped[found]]
+        d[:, 2] = (d[:, 2] + DIR_STEPS // 2) % DIR_STEPS - DIR_STEPS // 2
+
+        fits = np.all(np.abs(d[:, :2]) <= MAX_STEP, axis=1)
+        changed = np.any(d != 0, axis=1)
+        is_update = found & fits & changed
+        is_add = ~found | ~fits  # new ids, or jumps too large for a delta
+
+        upd = np.empty(int(is_update.sum()), dtype=UPDATE_DTYPE)
+        upd["id"] = ids[is_update]
+        upd["dx"] = d[is_update, 0]
+        upd["dy"] = d[is_update, 1]
+        upd["dr"] = d[is_update, 2]
+
+        removes = np.setdiff1d(prev_ids, ids, assume_unique=True)
+        return self._pack(KIND_DELTA, timestamp, ids[is_add], q[is_add], upd, removes)
+
+    def _record(self, sent: int, saved: int):
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now
+        self.frames += 1
+        self.bytes_sent += sent
+        self.bytes_saved += saved
+        self._saved_window.append((now, saved))
+        self._prune(now)
+
+    def _prune(self, now: float):
+        while self._saved_window and now - self._saved_window[0][0] > 1.0:
+            self._saved_window.popleft()
+
+    def stats(self) -> DeltaStats:
+        # prune here as well, so the rate drops to 0 once frames stop
+        now = time.perf_counter()
+        self._prune(now)
+        return DeltaStats(
+            frames=self.frames,
+            keyframes=self.keyframes,
+            bytes_sent=self.bytes_sent,
+            bytes_saved=self.bytes_saved,
+            bytes_saved_per_second=float(sum(saved for _, saved in list(self._saved_window))),
+            seconds=now - self._started if self._started is not None else 0.0
+        )
+
+
+class DeltaDecoder:
+    """
+    Reference decoder (pure Python) for the delta format.
+
+    Tracks the sequence number; after a gap it drops delta frames until the
+    next keyframe arrives (needs_keyframe tells the consumer to ask for one).
+    Packets older than the last one applied (reordered or duplicated) are
+    ignored and only counted in .reordered.
+    """
+
+    def __init__(self):
+        self.state: Dict[int, List[int]] = {}  # id -> [x, y, r] quantized
+        self.next_seq: Optional[int] = None
+        self.synced = False
+        self.lost = 0
+        self.reordered = 0
+        self.timestamp = 0.0
+
+    @property
+    def needs_keyframe(self) -> bool:
+        return not self.synced
+
+    def decode(self, payload: bytes) -> Optional[List[Dict]]:
+        """
+        Apply one packet; returns the people in receiver format, or None while waiting
+        for a keyframe or when the packet is older than the last one applied.
+        """
+        magic, version, kind, seq, timestamp, n_full, n_update, n_remove = DELTA_HEADER.unpack_from(payload, 0)
+        if magic != DELTA_MAGIC:
+            raise ValueError(f"Bad magic {magic!r}")
+        if version != DELTA_VERSION:
+            raise ValueError(f"Unsupported version {version}")
+        expected = (DELTA_HEADER.size + n_full * FULL_RECORD.size
+                    + n_update * UPDATE_RECORD.size + n_remove * REMOVE_RECORD.size)
+        if len(payload) != expected:
+            raise ValueError(f"Payload is {len(payload)} bytes, expected {expected}")
+
+        if self.next_seq is not None and seq != self.next_seq:
+            gap = (seq - self.next_seq) & 0xFFFFFFFF
+            if gap >= 0x80000000:
+                # behind next_seq (modulo wrap-around): a late or duplicate packet, not a loss
+                self.reordered += 1
+                return None
+            self.lost += gap
+            self.synced = False
+        self.next_seq = (seq + 1) & 0xFFFFFFFF
+
+        if kind == KIND_KEYFRAME:
+            self.state = {}
+            self.synced = True
+        elif not self.synced:
+            return None
+
+        offset = DELTA_HEADER.size
+        for _ in range(n_full):
+            track_id, x, y, r = FULL_RECORD.unpack_from(payload, offset)
+            self.state[track_id] = [x, y, r]
+            offset += FULL_RECORD.size
+        for _ in range(n_update):
+            track_id, dx, dy, dr = UPDATE_RECORD.unpack_from(payload, offset)
+            s = self.state[track_id]
+            s[0] += dx
+            s[1] += dy
+            s[2] = (s[2] + dr) % DIR_STEPS
+            offset += UPDATE_RECORD.size
+        for _ in range(n_remove):
+            (track_id,) = REMOVE_RECORD.unpack_from(payload, offset)
+            self.state.pop(track_id, None)
+            offset += REMOVE_RECORD.size
+
+        self.timestamp = timestamp
+        return [
+            {"id": track_id, "x": round(x * POS_RESOLUTION, 3), "y": round(y * POS_RESOLUTION, 3),
+             "z": 0.0, "r": round(r * DIR_RESOLUTION, 1)}
+            for track_id, (x, y, r) in sorted(self.state.items())
+        ]
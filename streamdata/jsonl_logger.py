@@ -0,0 +1,186 @@
+import gzip
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class JsonlLoggerStats:
+    written: int
+    dropped: int
+    segments: int
+    queued: int
+    failed: int  # records lost to write errors (disk full, permissions, ...)
+    last_error: Optional[str]
+
+
+class JsonlLogger:
+    """
+    Background JSONL writer.
+
+    write() only appends the record to a bounded queue; a writer thread drains
+    it in batches into time-stamped segment files next to `path`
+    (tracks.jsonl -> tracks_20250101-120000.jsonl), starting a new segment when
+    max_bytes or max_seconds is reached and optionally gzipping closed segments.
+    When the queue is full, records are dropped and counted instead of blocking
+    the caller. A batch that cannot be written is counted as failed and the
+    next batch starts a new segment, so the writer keeps going once the disk
+    problem is gone.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, max_seconds: Optional[float] = None,
+                 compress: bool = False, queue_size: int = 1024, flush_interval: float = 0.5):
+        self.base, self.ext = os.path.splitext(path)
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compress = compress
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+
+        # deque append/popleft are atomic, so the frame loop never takes a lock
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._running = True
+
+        self.written = 0
+        self.dropped = 0
+        self.segments = 0
+        self.failed = 0
+        self.last_error = None
+        self._failing = False
+
+        self._file = None
+        self._segment_path = None
+        self._segment_bytes = 0
+        self._segment_started = 0.0
+        self._compressors = []
+
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, record) -> bool:
+        """Queue one encoded line (bytes, including the newline). Returns False if it was dropped."""
+        if len(self._queue) >= self.queue_size:
+            self.dropped += 1
+            return False
+        # callers may reuse their buffer, so keep a copy
+        self._queue.append(bytes(record))
+        if len(self._queue) >= self.queue_size // 2:
+            self._wake.set()
+        return True
+
+    def close(self):
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout=5)
+        for t in self._compressors:
+            t.join(timeout=30)
+
+    def stats(self) -> JsonlLoggerStats:
+        return JsonlLoggerStats(
+            written=self.written,
+            dropped=self.dropped,
+            segments=self.segments,
+            queued=len(self._queue),
+            failed=self.failed,
+            last_error=self.last_error
+        )
+
+    #
+    # Writer thread
+    #
+    def _writer_loop(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        try:
+            self._close_segment()
+        except Exception as e:
+            print(f"[WARN] JSONL logger could not close {self._segment_path}: {e}")
+
+    def _drain(self):
+        batch = []
+        while self._queue:
+            batch.append(self._queue.popleft())
+        if not batch:
+            return
+
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            self.last_error = str(e)
+            if not self._failing:
+                print(f"[WARN] JSONL logger failed to write {len(batch)} records, continuing with a new segment: {e}")
+            self._failing = True
+            self._discard_segment()
+            return
+        if self._failing:
+            print(f"[INFO] JSONL logger writing again ({self.failed} records lost so far).")
+            self._failing = False
+
+    def _write_batch(self, batch):
+        if self._file is None or self._should_rotate():
+            self._close_segment()
+            self._open_segment()
+
+        data = b"".join(batch)
+        self._file.write(data)
+        self._file.flush()
+        self._segment_bytes += len(data)
+        self.written += len(batch)
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes is not None and self._segment_bytes >= self.max_bytes:
+            return True
+        if self.max_seconds is not None and time.time() - self._segment_started >= self.max_seconds:
+            return True
+        return False
+
+    def _open_segment(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = f"{self.base}_{stamp}{self.ext}"
+        n = 1
+        while os.path.exists(path) or os.path.exists(path + ".gz"):
+            path = f"{self.base}_{stamp}_{n}{self.ext}"
+            n += 1
+
+        self._file = open(path, "wb")
+        self._segment_path = path
+        self._segment_bytes = 0
+        self._segment_started = time.time()
+        self.segments += 1
+
+    def _discard_segment(self):
+        # the file may be unusable (disk full, removed); the next batch opens a new one
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if self.compress:
+            t = threading.Thread(target=_gzip_file, args=(self._segment_path,), daemon=True)
+            t.start()
+            self._compressors = [c for c in self._compressors if c.is_alive()] + [t]
+
+
+def _gzip_file(path: str):
+    try:
+        with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(path)
+    except Exception as e:
+        print(f"[WARN] Could not compress {path}: {e}")
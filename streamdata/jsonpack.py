@@ -1,16 +1,19 @@
 from typing import List, Dict
-from datatypes.datatype import WorldPosition
+import numpy as np
 
-def format_live_packet(world_positions: List[WorldPosition], ts_str: str) -> Dict:
+def format_live_packet(frame_result: np.ndarray, ts_str: str) -> Dict:
     """Return the same packet structure your original script printed."""
-    people = []
-    for p in world_positions:
-        people.append({
-            "id": int(p.id),
-            "pos": [round(p.x, 3), round(p.y, 3)],
-            "dir_deg": round(p.r, 1),
-            "conf": round(p.conf, 2)
-        })
+    ids = frame_result["id"].tolist()
+    # Python round() per value, as the WorldPosition version did (np.round differs on ties like 2.675)
+    xs = [round(v, 3) for v in frame_result["x"].tolist()]
+    ys = [round(v, 3) for v in frame_result["y"].tolist()]
+    dirs = [round(v, 1) for v in frame_result["dir"].tolist()]
+    confs = [round(v, 2) for v in frame_result["conf"].tolist()]
+
+    people = [
+        {"id": i, "pos": [x, y], "dir_deg": r, "conf": c}
+        for i, x, y, r, c in zip(ids, xs, ys, dirs, confs)
+    ]
     return {"ts": ts_str, "people": people}
 
 def format_for_receiver(packet: Dict) -> List[Dict]:
@@ -1,14 +1,265 @@
+import errno
 import socket
 import json
-from typing import Any
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from streamdata.delta import DELTA_MAGIC, DeltaEncoder, DeltaDecoder
+
+# ----------------------------------------------------
+# Binary wire format (all little-endian)
+#   header : magic "MKOT" | version u8 | flags u8 | count u16 | seq u32 | capture timestamp f64
+#   record : id u32 | x f32 | y f32 | r f32   (z is always 0 and not sent)
+# ----------------------------------------------------
+BINARY_MAGIC = b"MKOT"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sBBHId")
+BINARY_RECORD = struct.Struct("<Ifff")
+BINARY_RECORD_DTYPE = np.dtype([("id", "<u4"), ("x", "<f4"), ("y", "<f4"), ("r", "<f4")])
+
+
+class BinaryEncoder:
+    """Packs a frame result into the binary wire format, numbering frames with a wrapping sequence counter."""
+
+    def __init__(self):
+        self.seq = 0
+
+    def encode(self, frame_result: np.ndarray, timestamp: float) -> bytes:
+        n = len(frame_result)
+        records = np.empty(n, dtype=BINARY_RECORD_DTYPE)
+        records["id"] = frame_result["id"]
+        records["x"] = frame_result["x"]
+        records["y"] = frame_result["y"]
+        records["r"] = frame_result["dir"]
+
+        header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, n, self.seq, timestamp)
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        return header + records.tobytes()
+
+
+@dataclass
+class BinaryFrame:
+    seq: int
+    timestamp: float
+    people: List[Dict]
+
+
+def decode_binary(payload: bytes) -> BinaryFrame:
+    """
+    Reference decoder for the binary wire format (pure Python, no numpy).
+    People are returned in the same shape as the JSON receiver format.
+    """
+    if len(payload) < BINARY_HEADER.size:
+        raise ValueError(f"Payload too short for header ({len(payload)} bytes)")
+
+    magic, version, _flags, count, seq, timestamp = BINARY_HEADER.unpack_from(payload, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"Bad magic {magic!r}")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported version {version}")
+    expected = BINARY_HEADER.size + count * BINARY_RECORD.size
+    if len(payload) != expected:
+        raise ValueError(f"Payload is {len(payload)} bytes, expected {expected} for {count} records")
+
+    people = []
+    for track_id, x, y, r in BINARY_RECORD.iter_unpack(payload[BINARY_HEADER.size:]):
+        people.append({"id": track_id, "x": x, "y": y, "z": 0.0, "r": r})
+    return BinaryFrame(seq=seq, timestamp=timestamp, people=people)
+
+
+# ----------------------------------------------------
+# Fragmentation (used when NetworkSettings.fragment is on)
+#   every datagram: magic "MKOF" | frame id u32 | chunk index u16 | chunk count u16 | chunk bytes
+# ----------------------------------------------------
+FRAGMENT_MAGIC = b"MKOF"
+FRAGMENT_HEADER = struct.Struct("<4sIHH")
+
+# Linux UDP generic segmentation offload: one sendmsg() carries many equally sized datagrams
+SOL_UDP = getattr(socket, "SOL_UDP", 17)
+UDP_SEGMENT = getattr(socket, "UDP_SEGMENT", 103)
+GSO_MAX_SEGMENTS = 64
+GSO_MAX_BYTES = 65000
+# errors meaning the kernel/socket does not do GSO; anything else is the target's problem
+GSO_UNSUPPORTED_ERRNOS = (errno.EINVAL, errno.ENOPROTOOPT, errno.EOPNOTSUPP)
+
+
+def fragment(payload: bytes, frame_id: int, max_datagram: int = 1400) -> List[bytes]:
+    """Split a payload into datagrams of at most max_datagram bytes, each with a fragment header."""
+    chunk_size = max_datagram - FRAGMENT_HEADER.size
+    if chunk_size <= 0:
+        raise ValueError(f"max_datagram must be larger than {FRAGMENT_HEADER.size}")
+    view = memoryview(payload)
+    count = max(1, -(-len(view) // chunk_size))
+    if count > 0xFFFF:
+        raise ValueError(f"Payload of {len(view)} bytes needs too many fragments")
+
+    frame_id &= 0xFFFFFFFF
+    return [
+        FRAGMENT_HEADER.pack(FRAGMENT_MAGIC, frame_id, i, count) + view[i * chunk_size:(i + 1) * chunk_size]
+        for i in range(count)
+    ]
+
+
+class FragmentReassembler:
+    """Collects fragments per frame id; frames that stay incomplete for longer than timeout seconds are dropped."""
+
+    def __init__(self, timeout: float = 0.5):
+        self.timeout = timeout
+        self._frames: Dict[int, Tuple[float, List[Optional[bytes]]]] = {}
+        self.completed = 0
+        self.expired = 0
+
+    def feed(self, datagram: bytes, now: Optional[float] = None) -> Optional[bytes]:
+        """Add one datagram; returns the full payload once its last missing fragment arrives."""
+        if now is None:
+            now = time.monotonic()
+        self._expire(now)
+
+        magic, frame_id, index, count = FRAGMENT_HEADER.unpack_from(datagram, 0)
+        if magic != FRAGMENT_MAGIC or index >= count:
+            raise ValueError("Not a valid fragment")
+
+        entry = self._frames.get(frame_id)
+        if entry is None or len(entry[1]) != count:
+            # new frame, or a stale partial one from before a sender restart reusing the id
+            entry = self._frames[frame_id] = (now, [None] * count)
+        started, chunks = entry
+        chunks[index] = datagram[FRAGMENT_HEADER.size:]
+        if any(chunk is None for chunk in chunks):
+            return None
+
+        del self._frames[frame_id]
+        self.completed += 1
+        return b"".join(chunks)
+
+    def _expire(self, now: float):
+        for frame_id in [f for f, (started, _) in self._frames.items() if now - started > self.timeout]:
+            del self._frames[frame_id]
+            self.expired += 1
+
 
 class UDPSender:
     def __init__(self, settings):
         self.host = settings.host
         self.port = settings.port
+        self.protocol = getattr(settings, "protocol", "json")
+        if self.protocol not in ("json", "binary", "delta"):
+            raise ValueError(f"Unknown network protocol '{self.protocol}'")
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.encoder = BinaryEncoder()
+        self.delta = DeltaEncoder(getattr(settings, "keyframe_interval", 30))
+
+        self.fragment = getattr(settings, "fragment", False)
+        self.max_datagram = getattr(settings, "max_datagram", 1400)
+        self.frame_id = 0
+        # batched sends via UDP GSO where the kernel supports it, plain sendto otherwise
+        self.use_gso = sys.platform.startswith("linux")
 
     def send(self, obj: Any):
         """Sends object as JSON string via UDP."""
         payload = json.dumps(obj).encode("utf-8")
         self.sock.sendto(payload, (self.host, self.port))
+
+    def send_bytes(self, payload):
+        """Sends an already encoded payload via UDP, split into MTU-sized fragments if enabled."""
+        self._send_datagrams(self._datagrams(payload), (self.host, self.port))
+
+    def _datagrams(self, payload) -> List[bytes]:
+        if not self.fragment:
+            return [payload]
+        datagrams = fragment(payload, self.frame_id, self.max_datagram)
+        self.frame_id = (self.frame_id + 1) & 0xFFFFFFFF
+        return datagrams
+
+    def _send_datagrams(self, datagrams: List[bytes], address):
+        if len(datagrams) > 1 and self.use_gso:
+            try:
+                self._send_gso(datagrams, address)
+                return
+            except OSError as e:
+                if e.errno not in GSO_UNSUPPORTED_ERRNOS:
+                    raise  # a problem with this target, not with GSO
+                print(f"[WARN] UDP segmentation offload unavailable ({e}); falling back to one sendto per fragment.")
+                self.use_gso = False
+        for datagram in datagrams:
+            self.sock.sendto(datagram, address)
+
+    def _send_gso(self, datagrams: List[bytes], address):
+        # all fragments are max_datagram bytes except the last, which is what GSO requires
+        per_call = min(GSO_MAX_SEGMENTS, GSO_MAX_BYTES // self.max_datagram)
+        cmsg = [(SOL_UDP, UDP_SEGMENT, struct.pack("=H", self.max_datagram))]
+        for start in range(0, len(datagrams), per_call):
+            batch = datagrams[start:start + per_call]
+            if len(batch) == 1:
+                self.sock.sendto(batch[0], address)
+            else:
+                self.sock.sendmsg([b"".join(batch)], cmsg, 0, address)
+
+    def send_frame(self, frame_result: np.ndarray, timestamp: float, json_payload):
+        """Sends a frame in the configured protocol; json_payload is the pre-encoded receiver JSON."""
+        self.send_bytes(self.encode_frame(frame_result, timestamp, json_payload))
+
+    def encode_frame(self, frame_result: np.ndarray, timestamp: float, json_payload):
+        if self.protocol == "binary":
+            return self.encoder.encode(frame_result, timestamp)
+        if self.protocol == "delta":
+            return self.delta.encode(frame_result, timestamp)
+        return json_payload
+
+    def close(self):
+        self.sock.close()
+
+
+class LoopbackReceiver:
+    """
+    Minimal local UDP receiver, decoding the JSON, binary and delta formats.
+    Binds to an ephemeral port on 127.0.0.1 by default; point NetworkSettings.port at .port.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, bufsize: int = 65535):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.host, self.port = self.sock.getsockname()
+        self.bufsize = bufsize
+        self.delta = DeltaDecoder()
+        self.reassembler = FragmentReassembler()
+
+    def recv(self, timeout: Optional[float] = 1.0) -> Optional[bytes]:
+        """Return the next payload (reassembled from fragments if needed), or None on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self.sock.settimeout(remaining)
+            try:
+                datagram, _ = self.sock.recvfrom(self.bufsize)
+            except (socket.timeout, BlockingIOError):
+                return None
+            if datagram[:len(FRAGMENT_MAGIC)] != FRAGMENT_MAGIC:
+                return datagram
+            payload = self.reassembler.feed(datagram)
+            if payload is not None:
+                return payload
+
+    def recv_people(self, timeout: Optional[float] = 1.0) -> Optional[List[Dict]]:
+        """
+        Return the people of the next frame as receiver-format dicts, or None on timeout
+        (or, for the delta format, while waiting for a keyframe after loss).
+        """
+        payload = self.recv(timeout)
+        if payload is None:
+            return None
+        if payload[:len(BINARY_MAGIC)] == BINARY_MAGIC:
+            return decode_binary(payload).people
+        if payload[:len(DELTA_MAGIC)] == DELTA_MAGIC:
+            return self.delta.decode(payload)
+        return json.loads(payload)
+
+    def close(self):
+        self.sock.close()
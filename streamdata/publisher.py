@@ -0,0 +1,150 @@
+import asyncio
+import socket
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from streamdata.delta import DeltaEncoder
+from streamdata.messaging import UDPSender
+
+
+@dataclass
+class TargetStats:
+    address: Tuple[str, int]
+    sent: int = 0
+    dropped: int = 0  # socket buffer full, frame skipped for this target
+    errors: int = 0
+    last_error: Optional[str] = None
+
+
+class Publisher(UDPSender):
+    """
+    Fan-out UDP publisher.
+
+    Encodes each frame once (same protocol/fragmentation options as UDPSender)
+    and sends the datagrams to every unicast target and the optional multicast
+    group over a non-blocking socket. Failures are counted per target and never
+    raised into the tracking loop. With async_send the encode + send runs on a
+    background asyncio loop; frames beyond send_queue_size pending are dropped.
+
+    With the delta protocol every target gets its own DeltaEncoder (.deltas), so
+    request_keyframe(address) resyncs one receiver without sending keyframes to
+    the others. The multicast group is a single target: its members share one
+    delta stream, and a member joining late waits for the next keyframe unless
+    one is requested for the group address.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.sock.setblocking(False)
+
+        targets = [tuple(t) for t in getattr(settings, "targets", [])] or [(self.host, self.port)]
+        group = getattr(settings, "multicast_group", None)
+        if group:
+            targets.append((group, getattr(settings, "multicast_port", None) or self.port))
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, getattr(settings, "multicast_ttl", 1))
+        self.targets: List[TargetStats] = [TargetStats(address=t) for t in targets]
+        self.deltas: Dict[Tuple[str, int], DeltaEncoder] = {}
+        if self.protocol == "delta":
+            keyframe_interval = getattr(settings, "keyframe_interval", 30)
+            self.deltas = {target.address: DeltaEncoder(keyframe_interval) for target in self.targets}
+
+        self.send_queue_size = getattr(settings, "send_queue_size", 4)
+        self.queue_dropped = 0
+        # each counter is only written by one thread: submitted by the caller, completed by the loop
+        self._submitted = 0
+        self._completed = 0
+        self._loop = None
+        self._thread = None
+        if getattr(settings, "async_send", False):
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._thread.start()
+
+    def send_bytes(self, payload):
+        """Sends an already encoded payload to all targets."""
+        datagrams = self._datagrams(payload)
+        for target in self.targets:
+            self._send_to(target, datagrams)
+
+    def request_keyframe(self, address: Optional[Tuple[str, int]] = None):
+        """Send a delta keyframe next frame to the target at address (all targets when None)."""
+        if address is None:
+            for delta in self.deltas.values():
+                delta.request_keyframe()
+        else:
+            self.deltas[tuple(address)].request_keyframe()
+
+    def send_frame(self, frame_result: np.ndarray, timestamp: float, json_payload):
+        """Sends a frame to all targets; returns immediately when async_send is on."""
+        if self._loop is None:
+            self._send_frame(frame_result, timestamp, json_payload)
+            return
+
+        if self.pending >= self.send_queue_size:
+            self.queue_dropped += 1
+            return
+        self._submitted += 1
+        # the serializer reuses its buffer, so hand the loop its own copy
+        json_payload = bytes(json_payload) if json_payload is not None else None
+        self._loop.call_soon_threadsafe(self._send_frame_async, frame_result, timestamp, json_payload)
+
+    def _send_frame(self, frame_result, timestamp, json_payload):
+        if not self.deltas:
+            super().send_frame(frame_result, timestamp, json_payload)
+            return
+        # one delta stream per target, each with its own receiver state
+        for target in self.targets:
+            payload = self.deltas[target.address].encode(frame_result, timestamp)
+            self._send_to(target, self._datagrams(payload))
+
+    def _send_to(self, target: TargetStats, datagrams):
+        try:
+            self._send_datagrams(datagrams, target.address)
+            target.sent += 1
+        except BlockingIOError:
+            target.dropped += 1
+        except OSError as e:
+            target.errors += 1
+            target.last_error = str(e)
+
+    def _send_frame_async(self, frame_result, timestamp, json_payload):
+        try:
+            self._send_frame(frame_result, timestamp, json_payload)
+        except Exception as e:
+            print(f"[WARN] Publisher failed to send frame: {e}")
+        finally:
+            self._completed += 1
+
+    @property
+    def pending(self) -> int:
+        return self._submitted - self._completed
+
+    def stats(self) -> List[TargetStats]:
+        """Snapshot of the per-target counters."""
+        return [replace(target) for target in self.targets]
+
+    def log_stats(self):
+        """Prints what the delta protocol saved per target (nothing for json/binary)."""
+        for (host, port), delta in self.deltas.items():
+            stats = delta.stats()
+            if not stats.frames:
+                continue
+            average = stats.bytes_saved / stats.seconds if stats.seconds > 0 else 0.0
+            print(f"[INFO] Delta stream to {host}:{port}: {stats.frames} frames, {stats.keyframes} keyframes, "
+                  f"{stats.bytes_sent / 1024:.1f} kB sent, {stats.bytes_saved / 1024:.1f} kB saved "
+                  f"(~{average:.0f} B/s, {stats.bytes_saved_per_second:.0f} B/s over the last second)")
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=1)
+            if self._thread.is_alive():
+                # still inside a send; the daemon thread ends with the process
+                print("[WARN] Publisher send loop did not stop within 1s; leaving it running.")
+            else:
+                self._loop.close()
+            self._loop = None
+        super().close()
@@ -0,0 +1,53 @@
+import json
+from itertools import chain
+from typing import Tuple
+
+import numpy as np
+
+# byte-for-byte the layout json.dumps produces for the dicts in jsonpack
+RECEIVER_RECORD = '{"id": %d, "x": %s, "y": %s, "z": 0.0, "r": %s}'
+LOG_RECORD = '{"id": %d, "pos": [%s, %s], "dir_deg": %s, "conf": %s}'
+
+
+class FrameSerializer:
+    """
+    Single-pass encoder for a frame result.
+
+    Produces the receiver payload (same bytes as json.dumps(format_for_receiver(packet)))
+    and the JSONL log line (same bytes as json.dumps(packet) + newline) in one pass,
+    writing into two byte buffers that are reused every frame.
+    The returned buffers are only valid until the next call to encode().
+    """
+
+    def __init__(self):
+        self.receiver_buf = bytearray()
+        self.log_buf = bytearray()
+
+    def encode(self, frame_result: np.ndarray, ts_str: str) -> Tuple[bytearray, bytearray]:
+        # Python round() per value like jsonpack.format_live_packet (np.round differs on ties);
+        # each value is formatted once and shared by both outputs
+        ids = frame_result["id"].tolist()
+        xs = [repr(round(v, 3)) for v in frame_result["x"].tolist()]
+        ys = [repr(round(v, 3)) for v in frame_result["y"].tolist()]
+        dirs = [repr(round(v, 1)) for v in frame_result["dir"].tolist()]
+        confs = [repr(round(v, 2)) for v in frame_result["conf"].tolist()]
+        n = len(ids)
+
+        receiver_body = ", ".join([RECEIVER_RECORD] * n) % tuple(chain.from_iterable(zip(ids, xs, ys, dirs)))
+        log_body = ", ".join([LOG_RECORD] * n) % tuple(chain.from_iterable(zip(ids, xs, ys, dirs, confs)))
+
+        buf = self.receiver_buf
+        buf.clear()
+        buf += b"["
+        buf += receiver_body.encode("ascii")
+        buf += b"]"
+
+        buf = self.log_buf
+        buf.clear()
+        buf += b'{"ts": '
+        buf += json.dumps(ts_str).encode("ascii")
+        buf += b', "people": ['
+        buf += log_body.encode("ascii")
+        buf += b"]}\n"
+
+        return self.receiver_buf, self.log_buf
@@ -0,0 +1,381 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# track states, same values as supervision's TrackState
+TRACKED = 1
+LOST = 2
+REMOVED = 3
+
+_STD_POSITION = 1.0 / 20
+_STD_VELOCITY = 1.0 / 160
+_MOTION = np.eye(8)
+_MOTION[np.arange(4), np.arange(4) + 4] = 1.0
+
+
+@dataclass
+class Tracks:
+    """
+    Tracker output, one row per tracked detection: the detection's own box and
+    score with the id of the track it belongs to. Exposes the same fields the
+    rest of the pipeline reads from sv.Detections.
+    """
+    xyxy: np.ndarray        # (N, 4) float32
+    confidence: np.ndarray  # (N,) float32
+    class_id: np.ndarray    # (N,) int
+    tracker_id: np.ndarray  # (N,) int
+
+    def __len__(self):
+        return len(self.tracker_id)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, int), np.empty(0, int))
+
+
+class NumpyByteTracker:
+    """
+    ByteTrack on plain arrays.
+
+    A line-by-line port of supervision's ByteTrack (the version ByteTrackerWrapper
+    runs), so ids come out the same, but without an STrack object per detection:
+    Kalman state lives in (capacity, 8) / (capacity, 8, 8) arrays and predict /
+    update run vectorized over all tracks involved. Tracks are rows in those
+    arrays; the tracked / lost lists only hold row numbers, in ByteTrack's order,
+    because that order decides assignment ties and which track gets the next id.
+
+    update() takes raw (N, 6) [x1, y1, x2, y2, score, class] rows straight from
+    the model; update_with_detections() accepts sv.Detections so it can replace
+    ByteTrackerWrapper as is.
+    """
+
+    def __init__(self, settings=None, frame_rate: float = 30, track_activation_threshold: float = 0.25,
+                 minimum_matching_threshold: float = 0.8, capacity: int = 64):
+        lost_track_buffer = settings.lost_track_buffer if settings is not None else 30
+        self.track_activation_threshold = track_activation_threshold
+        self.minimum_matching_threshold = minimum_matching_threshold
+        self.det_thresh = track_activation_threshold + 0.1
+        if self.det_thresh > 1.0:
+            self.det_thresh = track_activation_threshold
+        self.max_time_lost = int(frame_rate / 30.0 * lost_track_buffer)
+        self.frame_id = 0
+
+        self._mean = np.zeros((capacity, 8))
+        self._cov = np.zeros((capacity, 8, 8))
+        self._state = np.zeros(capacity, np.int8)
+        self._activated = np.zeros(capacity, bool)
+        self._external_id = np.full(capacity, -1, int)
+        self._frame_id = np.zeros(capacity, int)
+        self._start_frame = np.zeros(capacity, int)
+        self._tracklet_len = np.zeros(capacity, int)
+        self._score = np.zeros(capacity, np.float32)
+        self._free: List[int] = list(range(capacity))
+        self._next_id = 1
+
+        self._tracked: List[int] = []
+        self._lost: List[int] = []
+        self._removed: List[int] = []
+
+    def update_with_detections(self, detections) -> Tracks:
+        """sv.Detections in, Tracks out (same ids as ByteTrackerWrapper.update_with_detections)."""
+        if detections.confidence is None:
+            raise ValueError("Detections confidence must be provided for tracking.")
+        boxes = np.empty((len(detections), 6), np.float32)
+        boxes[:, :4] = detections.xyxy
+        boxes[:, 4] = detections.confidence
+        boxes[:, 5] = detections.class_id if detections.class_id is not None else -1
+        return self.update(boxes)
+
+    def update(self, boxes: np.ndarray) -> Tracks:
+        """boxes: (N, 6) [x1, y1, x2, y2, score, class] in pixels. Returns the boxes that belong to a track."""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+        rows = self._step(boxes[:, :5])
+        if not rows:
+            return Tracks.empty()
+
+        # which input box each output track belongs to, as ByteTrack's update_with_detections does
+        track_xyxy = self._tlbr(rows)
+        cost = 1 - box_iou(boxes[:, :4], track_xyxy)
+        matches, _, _ = linear_assignment(cost, 0.5)
+        tracker_id = np.full(len(boxes), -1, int)
+        tracker_id[matches[:, 0]] = self._external_id[np.asarray(rows)[matches[:, 1]]]
+        keep = tracker_id != -1
+        return Tracks(boxes[keep, :4], boxes[keep, 4], boxes[keep, 5].astype(int), tracker_id[keep])
+
+    def reset(self):
+        self.frame_id = 0
+        self._next_id = 1
+        self._free = list(range(len(self._state)))
+        self._tracked, self._lost, self._removed = [], [], []
+
+    #
+    # ByteTrack step (supervision ByteTrack.update_with_tensors)
+    #
+    def _step(self, tensors: np.ndarray) -> List[int]:
+        self.frame_id += 1
+        activated, refound, lost, removed = [], [], [], []
+
+        w = tensors[:, 2] - tensors[:, 0]
+        h = tensors[:, 3] - tensors[:, 1]
+        tensors = tensors[np.isfinite(tensors).all(axis=1) & (w > 0) & (h > 0)]
+        scores = tensors[:, 4]
+        high = scores >= self.track_activation_threshold
+        second = (scores > 0.1) & (scores < self.track_activation_threshold)
+        det_tlwh, det_scores = _tlwh(tensors[high, :4]), scores[high]
+        low_tlwh, low_scores = _tlwh(tensors[second, :4]), scores[second]
+
+        unconfirmed = [r for r in self._tracked if not self._activated[r]]
+        confirmed = [r for r in self._tracked if self._activated[r]]
+
+        # first association: confirmed and lost tracks with the high score detections
+        pool = _joint(confirmed, self._lost)
+        self._predict(pool)
+        dists = _fuse_score(iou_distance(self._tlbr(pool), _tlwh_to_tlbr(det_tlwh)), det_scores)
+        matches, u_track, u_detection = linear_assignment(dists, self.minimum_matching_threshold)
+        self._update([pool[i] for i in matches[:, 0]], det_tlwh[matches[:, 1]], det_scores[matches[:, 1]],
+                     activated, refound)
+
+        # second association: the remaining tracked ones with the low score detections
+        r_tracked = [pool[i] for i in u_track if self._state[pool[i]] == TRACKED]
+        dists = iou_distance(self._tlbr(r_tracked), _tlwh_to_tlbr(low_tlwh))
+        matches, u_track, _ = linear_assignment(dists, 0.5)
+        self._update([r_tracked[i] for i in matches[:, 0]], low_tlwh[matches[:, 1]], low_scores[matches[:, 1]],
+                     activated, refound)
+        for i in u_track:
+            row = r_tracked[i]
+            if self._state[row] != LOST:
+                self._state[row] = LOST
+                lost.append(row)
+
+        # unconfirmed tracks (one frame old) get one chance with the leftover high score detections
+        det_tlwh, det_scores = det_tlwh[u_detection], det_scores[u_detection]
+        dists = _fuse_score(iou_distance(self._tlbr(unconfirmed), _tlwh_to_tlbr(det_tlwh)), det_scores)
+        matches, u_unconfirmed, u_detection = linear_assignment(dists, 0.7)
+        self._update([unconfirmed[i] for i in matches[:, 0]], det_tlwh[matches[:, 1]], det_scores[matches[:, 1]],
+                     activated, refound)
+        for i in u_unconfirmed:
+            self._state[unconfirmed[i]] = REMOVED
+            removed.append(unconfirmed[i])
+
+        # new tracks
+        new = u_detection[det_scores[u_detection] >= self.det_thresh]
+        activated.extend(self._activate(det_tlwh[new], det_scores[new]))
+
+        for row in self._lost:
+            if self.frame_id - self._frame_id[row] > self.max_time_lost:
+                self._state[row] = REMOVED
+                removed.append(row)
+
+        # like supervision, tracks removed from the lost list this frame stay in it until the next one
+        tracked = [r for r in self._tracked if self._state[r] == TRACKED]
+        tracked = _joint(_joint(tracked, activated), refound)
+        lost_tracks = _sub(self._lost, tracked) + lost
+        lost_tracks = _sub(lost_tracks, self._removed)
+        self._removed = removed
+        self._tracked, self._lost = self._remove_duplicates(tracked, lost_tracks)
+        self._release_rows()
+
+        return [r for r in self._tracked if self._activated[r]]
+
+    def _remove_duplicates(self, tracked, lost) -> Tuple[List[int], List[int]]:
+        dists = iou_distance(self._tlbr(tracked), self._tlbr(lost))
+        drop_a, drop_b = set(), set()
+        for a, b in zip(*np.where(dists < 0.05)):
+            ra, rb = tracked[a], lost[b]
+            if self._frame_id[ra] - self._start_frame[ra] > self._frame_id[rb] - self._start_frame[rb]:
+                drop_b.add(b)
+            else:
+                drop_a.add(a)
+        return ([r for i, r in enumerate(tracked) if i not in drop_a],
+                [r for i, r in enumerate(lost) if i not in drop_b])
+
+    #
+    # Kalman filter (supervision's byte_tracker KalmanFilter, vectorized over rows)
+    #
+    def _predict(self, rows):
+        if not rows:
+            return
+        rows = np.asarray(rows)
+        mean = self._mean[rows]
+        mean[self._state[rows] != TRACKED, 7] = 0
+        h = mean[:, 3]
+        std = np.stack([_STD_POSITION * h, _STD_POSITION * h, np.full_like(h, 1e-2), _STD_POSITION * h,
+                        _STD_VELOCITY * h, _STD_VELOCITY * h, np.full_like(h, 1e-5), _STD_VELOCITY * h], axis=1)
+        motion_cov = np.zeros((len(rows), 8, 8))
+        motion_cov[:, np.arange(8), np.arange(8)] = np.square(std)
+        self._mean[rows] = mean @ _MOTION.T
+        self._cov[rows] = _MOTION @ self._cov[rows] @ _MOTION.T + motion_cov
+
+    def _update(self, rows, tlwh, scores, activated, refound):
+        """Kalman update of matched tracks, then update() / re_activate() bookkeeping in match order."""
+        if not rows:
+            return
+        idx = np.asarray(rows)
+        mean, cov = self._mean[idx], self._cov[idx]
+        h = mean[:, 3]
+        std = np.stack([_STD_POSITION * h, _STD_POSITION * h, np.full_like(h, 1e-1), _STD_POSITION * h], axis=1)
+        projected_cov = cov[:, :4, :4].copy()
+        projected_cov[:, np.arange(4), np.arange(4)] += np.square(std)
+        gain = np.linalg.solve(projected_cov, cov[:, :, :4].transpose(0, 2, 1)).transpose(0, 2, 1)
+        innovation = _tlwh_to_xyah(tlwh) - mean[:, :4]
+        self._mean[idx] = mean + (gain @ innovation[:, :, None])[:, :, 0]
+        self._cov[idx] = cov - gain @ projected_cov @ gain.transpose(0, 2, 1)
+
+        for row, score in zip(rows, scores):
+            if self._state[row] == TRACKED:
+                self._tracklet_len[row] += 1
+                self._activated[row] = True
+                if self._external_id[row] == -1:
+                    self._external_id[row] = self._new_id()
+                activated.append(row)
+            else:
+                self._tracklet_len[row] = 0
+                self._state[row] = TRACKED
+                refound.append(row)
+            self._frame_id[row] = self.frame_id
+            self._score[row] = score
+
+    def _activate(self, tlwh, scores) -> List[int]:
+        rows = [self._new_row() for _ in range(len(tlwh))]
+        if not rows:
+            return rows
+        idx = np.asarray(rows)
+        xyah = _tlwh_to_xyah(tlwh)
+        # scaled in float32 like supervision does with the float32 measurement
+        pos = (2 * _STD_POSITION * xyah[:, 3]).astype(np.float64)
+        vel = (10 * _STD_VELOCITY * xyah[:, 3]).astype(np.float64)
+        std = np.stack([pos, pos, np.full_like(pos, 1e-2), pos, vel, vel, np.full_like(pos, 1e-5), vel], axis=1)
+        self._mean[idx, :4] = xyah
+        self._mean[idx, 4:] = 0
+        self._cov[idx] = 0
+        self._cov[idx[:, None], np.arange(8), np.arange(8)] = np.square(std)
+        self._state[idx] = TRACKED
+        self._tracklet_len[idx] = 1
+        self._frame_id[idx] = self.frame_id
+        self._start_frame[idx] = self.frame_id
+        self._score[idx] = scores
+        self._activated[idx] = False
+        self._external_id[idx] = -1
+        if self.frame_id == 1:
+            for row in rows:
+                self._activated[row] = True
+                self._external_id[row] = self._new_id()
+        return rows
+
+    def _tlbr(self, rows) -> np.ndarray:
+        """(N, 4) x1, y1, x2, y2 of the rows' Kalman state."""
+        xyah = self._mean[np.asarray(rows, dtype=int), :4]
+        w = xyah[:, 2] * xyah[:, 3]
+        x0 = xyah[:, 0] - w / 2
+        y0 = xyah[:, 1] - xyah[:, 3] / 2
+        return np.stack([x0, y0, x0 + w, y0 + xyah[:, 3]], axis=1)
+
+    #
+    # Rows and ids
+    #
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id - 1
+
+    def _new_row(self) -> int:
+        if not self._free:
+            self._grow()
+        return self._free.pop(0)
+
+    def _grow(self):
+        n = len(self._state)
+        self._mean = np.concatenate([self._mean, np.zeros((n, 8))])
+        self._cov = np.concatenate([self._cov, np.zeros((n, 8, 8))])
+        self._state = np.concatenate([self._state, np.zeros(n, np.int8)])
+        self._activated = np.concatenate([self._activated, np.zeros(n, bool)])
+        self._external_id = np.concatenate([self._external_id, np.full(n, -1, int)])
+        self._frame_id = np.concatenate([self._frame_id, np.zeros(n, int)])
+        self._start_frame = np.concatenate([self._start_frame, np.zeros(n, int)])
+        self._tracklet_len = np.concatenate([self._tracklet_len, np.zeros(n, int)])
+        self._score = np.concatenate([self._score, np.zeros(n, np.float32)])
+        self._free.extend(range(n, 2 * n))
+
+    def _release_rows(self):
+        in_use = np.zeros(len(self._state), bool)
+        in_use[self._tracked + self._lost + self._removed] = True
+        self._free = np.flatnonzero(~in_use).tolist()
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(N, 4) x (M, 4) xyxy -> (N, M) float32 IoU, computed in float64 like sv.box_iou_batch."""
+    if len(a) == 0 or len(b) == 0:
+        return np.empty((len(a), len(b)), np.float32)
+    a = a.astype(np.float64)
+    b = b.astype(np.float64)
+    inter_w = np.clip(np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    out = np.zeros(inter.shape, np.float32)
+    np.divide(inter, union, out=out, where=union > 0)
+    return out
+
+
+def iou_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """1 - IoU, with the boxes rounded to float32 first as ByteTrack's matching does."""
+    return 1 - box_iou(a.astype(np.float32), b.astype(np.float32))
+
+
+def linear_assignment(cost: np.ndarray, thresh: float):
+    """Optimal assignment with costs above thresh left unmatched: (matches (K, 2), unmatched rows, unmatched cols)."""
+    rows, cols = cost.shape
+    if cost.size == 0:
+        return np.empty((0, 2), int), np.arange(rows), np.arange(cols)
+    capped = cost.copy()
+    capped[capped > thresh] = thresh + 1e-4
+    r, c = linear_sum_assignment(capped)
+    ok = cost[r, c] <= thresh
+    matches = np.stack([r[ok], c[ok]], axis=1)
+    # unmatched indices in python set order, as supervision returns them (this order decides new ids)
+    unmatched_rows = np.array(tuple(set(range(rows)) - set(r[ok].tolist())), dtype=int)
+    unmatched_cols = np.array(tuple(set(range(cols)) - set(c[ok].tolist())), dtype=int)
+    return matches, unmatched_rows, unmatched_cols
+
+
+def _fuse_score(cost: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    if cost.size == 0:
+        return cost
+    return 1 - (1 - cost) * scores[None, :]
+
+
+def _tlwh(xyxy: np.ndarray) -> np.ndarray:
+    tlwh = xyxy.copy()
+    tlwh[:, 2:] -= tlwh[:, :2]
+    return tlwh
+
+
+def _tlwh_to_tlbr(tlwh: np.ndarray) -> np.ndarray:
+    tlbr = tlwh.copy()
+    tlbr[:, 2:] += tlbr[:, :2]
+    return tlbr
+
+
+def _tlwh_to_xyah(tlwh: np.ndarray) -> np.ndarray:
+    xyah = tlwh.copy()
+    xyah[:, :2] += xyah[:, 2:] / 2
+    xyah[:, 2] /= xyah[:, 3]
+    return xyah
+
+
+def _joint(a: List[int], b: List[int]) -> List[int]:
+    seen = set(a)
+    result = list(a)
+    for r in b:
+        if r not in seen:
+            seen.add(r)
+            result.append(r)
+    return result
+
+
+def _sub(a: List[int], b: List[int]) -> List[int]:
+    drop = set(b)
+    return [r for r in a if r not in drop]
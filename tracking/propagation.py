@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+import supervision as sv
+
+PROPAGATE_FLOW = "flow"          # sparse Lucas-Kanade optical flow on a few points per box
+PROPAGATE_VELOCITY = "velocity"  # constant pixel velocity per track id
+PROPAGATION_METHODS = (PROPAGATE_FLOW, PROPAGATE_VELOCITY)
+
+_GRID = np.stack(np.meshgrid(np.linspace(0.3, 0.7, 3), np.linspace(0.2, 0.6, 3)), axis=-1).reshape(-1, 2)
+_MIN_FLOW_POINTS = 3
+
+
+@dataclass
+class PropagatorStats:
+    detected: int
+    propagated: int
+    interval: int
+    flow_failures: int  # boxes that fell back to constant velocity
+
+
+class TrackPropagator:
+    """
+    Lets the detector run only every Nth frame.
+
+    After every frame, observe() remembers the tracker's boxes; on frames
+    without detection, propagate() moves those boxes to the new frame (optical
+    flow, or each track's constant velocity) and the result is fed to the
+    tracker as if it were detections, so ids and output continue at full rate.
+
+    With adaptive scheduling the interval grows by one after every calm
+    keyframe (up to max_interval) and drops back to 1 as soon as boxes move
+    faster than motion_threshold or optical flow loses them.
+
+    should_detect() is called from the detection stage and observe()/propagate()
+    from the tracking stage, which may run on different threads; the decision
+    then simply follows one frame late.
+
+    With raw=True propagate() returns (N, 6) float32 rows for NumpyByteTracker
+    instead of sv.Detections.
+    """
+
+    def __init__(self, settings, raw: bool = False):
+        if settings.propagation not in PROPAGATION_METHODS:
+            raise ValueError(f"Unknown propagation '{settings.propagation}', expected one of {PROPAGATION_METHODS}")
+        self.method = settings.propagation
+        self.adaptive = settings.adaptive
+        self.max_interval = max(1, settings.max_interval if settings.adaptive else settings.interval)
+        self.interval = max(1, settings.interval)
+        self.motion_threshold = settings.motion_threshold
+        self.flow_width = settings.flow_width
+        self.raw = raw
+
+        self._last_detect_frame = None
+        self._force_detect = False
+        self._calm = True  # no escalation since the last keyframe
+
+        # state of the last observed frame
+        self._frame_number = None
+        self._gray = None
+        self._next_gray = None  # (frame_number, gray) computed by propagate(), reused by observe()
+        self._scale = 1.0
+        self._tracks = None
+        self._velocity = {}  # tracker id -> (4,) box change per frame, measured between keyframes
+        self._key_boxes = {}  # tracker id -> box on the last detected frame
+        self._key_frame_number = None
+
+        self.detected = 0
+        self.propagated = 0
+        self.flow_failures = 0
+
+    def should_detect(self, frame_number: int) -> bool:
+        """Decide (and record) whether this frame goes through the detector."""
+        detect = (self._force_detect or self._last_detect_frame is None or self._tracks is None
+                  or frame_number - self._last_detect_frame >= self.interval)
+        if detect:
+            self._force_detect = False
+            self._last_detect_frame = frame_number
+            self.detected += 1
+        return detect
+
+    def propagate(self, frame, frame_number: int):
+        """The last observed tracks moved to this frame, as detections for the tracker."""
+        tracks = self._tracks
+        if tracks is None or len(tracks) == 0:
+            return np.empty((0, 6), dtype=np.float32) if self.raw else sv.Detections.empty()
+        self.propagated += 1
+
+        frames = max(1, frame_number - self._frame_number)
+        shift = np.array([self._velocity.get(tid, np.zeros(4)) for tid in tracks.tracker_id.tolist()]) * frames
+        if self.method == PROPAGATE_FLOW and self._gray is not None:
+            shift = self._flow_shift(frame, frame_number, tracks.xyxy, shift)
+
+        h, w = frame.shape[:2]
+        xyxy = tracks.xyxy + shift
+        xyxy[:, 0::2] = np.clip(xyxy[:, 0::2], 0, w - 1)
+        xyxy[:, 1::2] = np.clip(xyxy[:, 1::2], 0, h - 1)
+        keep = (xyxy[:, 2] - xyxy[:, 0] > 1) & (xyxy[:, 3] - xyxy[:, 1] > 1)
+
+        if self.adaptive:
+            speed = np.abs(shift).max(axis=1) / frames
+            if np.any(speed > self.motion_threshold) or not np.all(keep):
+                self._escalate()
+
+        if self.raw:
+            rows = np.empty((int(keep.sum()), 6), dtype=np.float32)
+            rows[:, :4] = xyxy[keep]
+            rows[:, 4] = tracks.confidence[keep]
+            rows[:, 5] = tracks.class_id[keep]
+            return rows
+        return sv.Detections(
+            xyxy=xyxy[keep].astype(np.float32),
+            confidence=tracks.confidence[keep] if tracks.confidence is not None else None,
+            class_id=tracks.class_id[keep] if tracks.class_id is not None else None
+        )
+
+    def observe(self, frame, frame_number: int, tracks: sv.Detections, detected: bool):
+        """Remember the tracker output of this frame (and update per-track velocities on detected frames)."""
+        if detected and tracks.tracker_id is not None:
+            boxes = dict(zip(tracks.tracker_id.tolist(), tracks.xyxy))
+            if self._key_frame_number is not None:
+                frames = max(1, frame_number - self._key_frame_number)
+                velocity = {}
+                for tid, box in boxes.items():
+                    if tid in self._key_boxes:
+                        v = (box - self._key_boxes[tid]) / frames
+                        old = self._velocity.get(tid)
+                        velocity[tid] = v if old is None else 0.5 * old + 0.5 * v
+                self._velocity = velocity
+            self._key_boxes = boxes
+            self._key_frame_number = frame_number
+
+        if detected and self.adaptive:
+            if self._calm:
+                # nothing moved fast since the previous keyframe: allow one more frame between detections
+                self.interval = min(self.interval + 1, self.max_interval)
+            self._calm = True
+
+        self._tracks = tracks if tracks.tracker_id is not None else None
+        self._frame_number = frame_number
+        if self.method == PROPAGATE_FLOW:
+            if self._next_gray is not None and self._next_gray[0] == frame_number:
+                self._gray = self._next_gray[1]
+            else:
+                self._gray = self._to_gray(frame)
+            self._next_gray = None
+
+    def stats(self) -> PropagatorStats:
+        return PropagatorStats(
+            detected=self.detected,
+            propagated=self.propagated,
+            interval=self.interval,
+            flow_failures=self.flow_failures
+        )
+
+    #
+    # Internals
+    #
+    def _escalate(self):
+        self.interval = 1
+        self._force_detect = True
+        self._calm = False
+
+    def _to_gray(self, frame):
+        h, w = frame.shape[:2]
+        self._scale = min(1.0, self.flow_width / w)
+        if self._scale < 1.0:
+            frame = cv2.resize(frame, (int(w * self._scale), int(h * self._scale)), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+    def _flow_shift(self, frame, frame_number, xyxy, fallback):
+        """Median optical flow of a 3x3 point grid inside each box (upper body weighted); fallback where it fails."""
+        gray = self._to_gray(frame)
+        n = len(xyxy)
+        wh = (xyxy[:, 2:] - xyxy[:, :2])[:, None, :]
+        points = (xyxy[:, None, :2] + _GRID[None] * wh) * self._scale
+        points = points.reshape(-1, 1, 2).astype(np.float32)
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, points, None, winSize=(15, 15), maxLevel=2)
+        self._next_gray = (frame_number, gray)
+        flow = ((moved - points).reshape(n, len(_GRID), 2)) / self._scale
+        ok = status.reshape(n, len(_GRID)).astype(bool)
+
+        shift = fallback.copy()
+        lost = 0
+        for i in range(n):
+            if ok[i].sum() >= _MIN_FLOW_POINTS:
+                dx, dy = np.median(flow[i][ok[i]], axis=0)
+                shift[i] = (dx, dy, dx, dy)
+            else:
+                lost += 1
+        self.flow_failures += lost
+        if self.adaptive and lost > 0.3 * n:
+            self._escalate()
+        return shift
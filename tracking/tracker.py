@@ -1,10 +1,39 @@
 import supervision as sv
 
+from tracking.numpy_tracker import NumpyByteTracker
+
+TRACKER_BYTETRACK = "bytetrack"  # sv.ByteTrack
+TRACKER_NUMPY = "numpy"          # NumpyByteTracker, same ids without sv.Detections / STrack objects
+TRACKERS = (TRACKER_BYTETRACK, TRACKER_NUMPY)
+
+
 class ByteTrackerWrapper:
-    def __init__(self):
-        self.bt = sv.ByteTrack()
+    def __init__(self, settings=None, frame_rate: float = 30):
+        lost_track_buffer = settings.lost_track_buffer if settings is not None else 30
+        self.bt = sv.ByteTrack(lost_track_buffer=lost_track_buffer, frame_rate=frame_rate)
 
     def update_with_detections(self, detections: sv.Detections):
         """Return the tracker object used previously in your script (tracks with .xyxy, .confidence, .tracker_id)."""
         tracks = self.bt.update_with_detections(detections)
         return tracks
+
+
+def create_tracker(settings, frame_rate: float = 30):
+    """Tracker named by settings.tracker (TrackingSettings); both have update_with_detections()."""
+    tracker = getattr(settings, "tracker", TRACKER_BYTETRACK)
+    if tracker == TRACKER_BYTETRACK:
+        return ByteTrackerWrapper(settings, frame_rate=frame_rate)
+    if tracker == TRACKER_NUMPY:
+        return NumpyByteTracker(settings, frame_rate=frame_rate, capacity=settings.track_pool_size)
+    raise ValueError(f"Unknown tracker '{tracker}', expected one of {TRACKERS}")
+
+
+def lost_track_frames(settings, frame_rate: float = 30) -> int:
+    """
+    Tracker updates a track id can stay unseen before the tracker drops it
+    (ByteTrack's max_time_lost: lost_track_buffer scaled by frame_rate / 30).
+    Counted in frames rather than seconds: when the loop runs below frame_rate
+    the tracker holds a lost id for longer in wall time, and smoother state
+    evicted on a wall-clock timeout would be gone when the track is found again.
+    """
+    return int(frame_rate / 30.0 * settings.lost_track_buffer)
@@ -1,22 +1,99 @@
+import json
+import os
+
 import numpy as np
 import cv2
 from typing import Tuple
 
+
+def lut_meta_path(lut_path: str) -> str:
+    """Sidecar written by calibrate_floor.py next to the lookup table (lut.npy -> lut.json)."""
+    base, ext = os.path.splitext(lut_path)
+    return (base if ext == ".npy" else lut_path) + ".json"
+
+
 class Projector:
     def __init__(self, settings):
         self.H = None
-        if settings.use_homography:
+        self.lut = None
+        self.lut_stride = getattr(settings, "lut_stride", 1)
+
+        if getattr(settings, "use_lut", False):
+            try:
+                # memory-mapped, only the rows we index into get paged in
+                self.lut = np.load(settings.lut_path, mmap_mode="r")
+                if self.lut.ndim != 3 or self.lut.shape[2] != 2 or min(self.lut.shape[:2]) < 2:
+                    raise ValueError(f"unexpected lookup table shape {self.lut.shape}")
+                self.lut_stride = self._load_lut_stride(settings)
+            except Exception as e:
+                self.lut = None
+                print(f"[WARN] Could not load lookup table from {settings.lut_path} ({e}); falling back to homography.")
+
+        if self.lut is None and settings.use_homography:
             try:
                 self.H = np.load(settings.homography_path)
             except Exception:
                 self.H = None
                 print(f"[WARN] Could not load homography from {settings.homography_path}; homography disabled.")
 
+    @staticmethod
+    def _load_lut_stride(settings) -> int:
+        """The grid stride the table was built with, from its sidecar; settings.lut_stride for older tables."""
+        path = lut_meta_path(settings.lut_path)
+        try:
+            with open(path) as f:
+                return int(json.load(f)["stride"])
+        except FileNotFoundError:
+            print(f"[WARN] No {path} next to the lookup table; assuming lut_stride={settings.lut_stride}. "
+                  f"Re-run calibrate_floor.py to store the stride with the table.")
+            return settings.lut_stride
+
     def to_world(self, x_px: int, y_px: int) -> Tuple[float, float]:
-        if not len(self.H):
+        if self.lut is not None:
+            proj = self._lookup(np.array([[x_px, y_px]], dtype=np.float64))[0]
+            return float(proj[0]), float(proj[1])
+        if self.H is None:
             # Return screen coordinates as fallback
             return float(x_px), float(y_px)
         else:
             pt = np.array([[x_px, y_px]], dtype=np.float32).reshape(1,1,2)
             proj = cv2.perspectiveTransform(pt, self.H).reshape(2)
             return float(proj[0]), float(proj[1])
+
+    def to_world_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Project all foot points of a frame in one call.
+
+        Args:
+            points: (N,2) pixel coordinates
+
+        Returns:
+            (N,2) float64 world coordinates (pixel coordinates if homography is disabled)
+        """
+        points = np.asarray(points)
+        if len(points) == 0:
+            return np.empty((0, 2), dtype=np.float64)
+        if self.lut is not None:
+            return self._lookup(points.reshape(-1, 2))
+        if self.H is None:
+            # Identity fast path
+            return points.astype(np.float64).reshape(-1, 2)
+
+        pts = np.ascontiguousarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        return cv2.perspectiveTransform(pts, self.H).reshape(-1, 2).astype(np.float64)
+
+    def _lookup(self, points: np.ndarray) -> np.ndarray:
+        """Bilinear interpolation in the (rows, cols, 2) lookup table; points outside the frame are clamped."""
+        lut = self.lut
+        rows, cols = lut.shape[:2]
+
+        gx = np.clip(points[:, 0] / self.lut_stride, 0, cols - 1)
+        gy = np.clip(points[:, 1] / self.lut_stride, 0, rows - 1)
+        x0 = np.minimum(gx.astype(np.intp), cols - 2)
+        y0 = np.minimum(gy.astype(np.intp), rows - 2)
+        fx = (gx - x0)[:, None]
+        fy = (gy - y0)[:, None]
+
+        top = lut[y0, x0] * (1 - fx) + lut[y0, x0 + 1] * fx
+        bottom = lut[y0 + 1, x0] * (1 - fx) + lut[y0 + 1, x0 + 1] * fx
+        return top * (1 - fy) + bottom * fy
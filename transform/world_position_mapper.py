@@ -1,5 +1,6 @@
-from typing import List
-from datatypes.datatype import WorldPosition, BBox
+import numpy as np
+
+from datatypes.datatype import empty_frame_result
 from transform.projection import Projector
 from filters.smoothing import KalmanSmoother
 
@@ -12,7 +13,7 @@ class WorldPositionMapper:
         self.projector = projector
         self.smoother = smoother
 
-    def map_tracks(self, tracks, timestamp: float) -> List[WorldPosition]:
+    def map_tracks(self, tracks, timestamp: float) -> np.ndarray:
         """
         Convert tracked bounding boxes into smoothed world positions.
 
@@ -21,36 +22,32 @@ class WorldPositionMapper:
             timestamp: current time in seconds
 
         Returns:
-            List[WorldPosition]
+            Frame result array (datatypes.datatype.FRAME_RESULT_DTYPE), one row per track
         """
-        world_positions = []
-
-        for i, xyxy in enumerate(getattr(tracks, "xyxy", [])):
-            try:
-                conf = float(tracks.confidence[i]) if getattr(tracks, "confidence", None) is not None else 0.0
-                track_id = int(tracks.tracker_id[i])
-
-                x1, y1, x2, y2 = xyxy.astype(int)
-                foot_x = (x1 + x2) // 2
-                foot_y = y2
-
-                # px -> world
-                x_world, y_world = self.projector.to_world(foot_x, foot_y)
-
-                # smoothing + speed/direction
-                x_smoothed, y_smoothed, speed, direction = self.smoother.update(track_id, x_world, y_world, timestamp)
-
-                wp = WorldPosition(
-                    id=track_id,
-                    x=x_smoothed,
-                    y=y_smoothed,
-                    r=direction,
-                    conf=conf
-                )
-
-                world_positions.append(wp)
-
-            except Exception as e:
-                print(f"[ERROR] Failed processing track {i}: {e}")
-
-        return world_positions
+        xyxy = getattr(tracks, "xyxy", None)
+        if xyxy is None or len(xyxy) == 0:
+            # still a tracker frame for the smoother's ttl_frames
+            self.smoother.skip(timestamp)
+            return empty_frame_result()
+
+        result = empty_frame_result(len(xyxy))
+        result["id"] = tracks.tracker_id
+        if getattr(tracks, "confidence", None) is not None:
+            result["conf"] = tracks.confidence
+
+        # foot point = bottom center of the bbox
+        boxes = result["bbox"]
+        boxes[:] = xyxy
+        foot = result["foot"]
+        foot[:, 0] = (boxes[:, 0] + boxes[:, 2]) // 2
+        foot[:, 1] = boxes[:, 3]
+
+        # px -> world
+        world = self.projector.to_world_batch(foot)
+
+        # smoothing + speed/direction for all tracks in one step
+        result["x"], result["y"], result["speed"], result["dir"] = self.smoother.update_batch(
+            result["id"], world[:, 0], world[:, 1], timestamp
+        )
+
+        return result
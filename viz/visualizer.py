@@ -1,32 +1,27 @@
-from typing import List
-
 import cv2
 
 from .palette import ColorPalette
-from datatypes.datatype import WorldPosition
 
 # TODO: this feels needlessly complex
 palette = ColorPalette()
 
 
-def draw_frame(frame, tracks, settings, fps_tracker = None):
+def draw_frame(frame, frame_result, settings, fps_tracker = None):
     vis = frame.copy()
-    # draw tracked bboxes and foot positions (tracks expected to have xyxy, confidence, tracker_id)
-    if tracks is not None:
-        for i, xyxy in enumerate(getattr(tracks, "xyxy", [])):
-            x1, y1, x2, y2 = xyxy.astype(int)
-            conf = float(tracks.confidence[i]) if getattr(tracks, "confidence", None) is not None else 0.0
-            tid = int(tracks.tracker_id[i])
+    # draw tracked bboxes and foot positions (frame_result rows as produced by WorldPositionMapper)
+    if frame_result is not None:
+        for tid, conf, (x1, y1, x2, y2), (foot_x, foot_y) in zip(
+            frame_result["id"].tolist(), frame_result["conf"].tolist(),
+            frame_result["bbox"].tolist(), frame_result["foot"].tolist()
+        ):
             color = palette.by_idx(tid)
             cv2.rectangle(vis, (x1, y1), (x2, y2), color, 2)
-            foot_x = (x1 + x2) // 2
-            foot_y = y2
             cv2.circle(vis, (foot_x, foot_y), 5, color, -1)
             cv2.putText(vis, f"ID {tid} | {round(conf,2)}", (x1, y1 - 8),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
 
     if settings.show_tracker_count:
-        cv2.putText(vis, f"People: {len(tracks)}", (12,28),
+        cv2.putText(vis, f"People: {len(frame_result)}", (12,28),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,255,0), 2)
     
     # TODO: simplify this to only using settings.show_fps and initialize fps_tracker instance in main depending on that value